@@ -0,0 +1,154 @@
+# asgi.py
+"""ASGI entry point: /meta, /stream and /catalog run on the asyncio scrape path,
+every other route is served by the Flask app.
+
+Run with: uvicorn asgi:app --port 8080
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+import addon
+import async_scrape
+
+logger = logging.getLogger(__name__)
+
+# Optional leading path segment is the user profile config, as in the Flask routes
+ROUTE = re.compile(r'^(?:/([^/]+))?/(meta|stream|catalog)/([^/]+)/([^/]+)\.json$')
+
+flask_app = WsgiToAsgi(addon.app)
+
+
+async def respond_with(send, data: Any, status: int = 200, max_age: int = addon.RESPONSE_MAX_AGE) -> None:
+    """Send a JSON response with the same headers as addon.respond_with."""
+    body = json.dumps(data, sort_keys=True).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'access-control-allow-origin', b'*'),
+            (b'access-control-allow-headers', b'*'),
+            (b'cache-control', f'public, max-age={max_age}'.encode()),
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def addon_meta(send, type: str, id: str, query: dict, profile: dict) -> None:
+    try:
+        data = await async_scrape.get_parsed_guide(id.split('-')[-1])
+        await respond_with(send, *addon.build_meta_response(type, id, data, profile), max_age=addon.guide_max_age(data))
+    except Exception as e:
+        logger.error(f"Error in addon_meta: {e}")
+        await respond_with(send, {'error': str(e)}, 500)
+
+
+async def addon_stream(send, type: str, id: str, query: dict, profile: dict) -> None:
+    try:
+        id = id.replace('%3A', '_')
+        if 'gpg' in id:
+            return await respond_with(send, {'error': 'Not found'}, 404)
+
+        # Check age rating before proceeding
+        guide = await async_scrape.get_parsed_guide(addon.stream_imdb_id(id))
+        blocked = addon.build_blocked_stream(id, guide, profile)
+        if blocked:
+            return await respond_with(send, blocked, 403, addon.guide_max_age(guide))
+
+        if type == 'series':
+            ep_id = await async_scrape.getEpId(id)
+            if not ep_id:
+                return await respond_with(send, {'error': 'Not found'}, 404)
+            id = f"{id}-{ep_id}"
+
+        await respond_with(send, addon.build_streams(type, id, guide))
+    except Exception as e:
+        logger.error(f"Error in addon_stream: {e}")
+        await respond_with(send, {'error': str(e)}, 500)
+
+
+async def addon_catalog(send, type: str, id: str, query: dict, profile: dict) -> None:
+    try:
+        search = query.get('query', [''])[0]
+        key = addon.catalog_cache_key(id, search)
+        if key is None:
+            return await respond_with(send, {'error': 'Invalid catalog ID.'}, 400)
+        if id == 'gpg_movies_catalog':
+            items = await async_scrape.get_catalog_items(id, key, lambda: async_scrape.fetch_imdb_popular('movie'))
+        elif id == 'gpg_series_catalog':
+            items = await async_scrape.get_catalog_items(id, key, lambda: async_scrape.fetch_imdb_popular('series'))
+        else:
+            if not search:
+                return await respond_with(send, {'metas': []})
+            content_type = 'movie' if 'movie' in id else 'series'
+            items = await async_scrape.get_catalog_items(id, key, lambda: async_scrape.search_imdb(search, content_type))
+
+        columns = await asyncio.to_thread(addon.get_cached_columns, key, type, items)
+        if columns is None:
+            guides = await async_scrape.resolve_guides([item['id'] for item in items])
+            columns = await asyncio.to_thread(
+                addon.store_columns, key, type, items, addon.build_catalog_columns(type, items, guides))
+        metas, pending = addon.filter_catalog(columns, profile), columns.pending
+        if pending or columns.transient:
+            logger.info(f"Catalog {id} returned with {pending} titles pending and {columns.transient} failed")
+            return await respond_with(send, {'metas': metas}, max_age=addon.CATALOG_PARTIAL_MAX_AGE)
+        await respond_with(send, {'metas': metas})
+    except Exception as e:
+        logger.error(f"Error in addon_catalog: {e}")
+        await respond_with(send, {'error': 'Internal server error'}, 500)
+
+
+def timed_send(send, route: str):
+    """Wrap send so the response is counted in the same route metrics as the Flask app."""
+    start = time.perf_counter()
+
+    async def send_and_observe(message):
+        if message['type'] == 'http.response.start':
+            addon.ROUTE_SECONDS.observe(time.perf_counter() - start, route)
+            addon.ROUTE_RESPONSES.inc(route, str(message['status']))
+        await send(message)
+    return send_and_observe
+
+
+HANDLERS = {
+    'meta': addon_meta,
+    'stream': addon_stream,
+    'catalog': addon_catalog,
+}
+
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_scrape.close_client()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+        match = ROUTE.match(scope['path'])
+        if match:
+            config, resource, type, id = match.groups()
+            try:
+                profile = addon.parse_profile(config)
+            except ValueError as e:
+                return await respond_with(send, {'error': str(e)}, 400)
+            query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+            return await HANDLERS[resource](timed_send(send, f'/{resource}/<type>/<id>.json'), type, id, query, profile)
+
+    await flask_app(scope, receive, send)
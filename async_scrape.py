@@ -0,0 +1,297 @@
+# async_scrape.py
+"""asyncio versions of the IMDb fetch and scrape path.
+
+Fetching goes through one shared httpx.AsyncClient, so a single process can have
+hundreds of upstream requests in flight. Parsing, rating and caching reuse the
+synchronous helpers in addon.py, so both paths return identical records; those
+helpers parse with lxml and may hit SQLite or Redis, so they run in worker threads
+(asyncio.to_thread) to keep the event loop free.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+import httpx
+
+import addon
+
+logger = logging.getLogger(__name__)
+
+ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', 200))  # Upstream connections in flight
+ASYNC_SCRAPE_CONCURRENCY = int(os.getenv('ASYNC_SCRAPE_CONCURRENCY', 50))  # Parallel scrapes per catalog request
+
+_client: Optional[httpx.AsyncClient] = None
+_background_tasks = set()
+_guide_flights: Dict[Hashable, asyncio.Task] = {}
+_season_flights: Dict[Hashable, asyncio.Task] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared async client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers=addon.IMDB_HEADERS,
+            timeout=addon.HTTP_TIMEOUT,
+            follow_redirects=True,  # Like requests; IMDb redirects merged and renamed titles
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=addon.HTTP_POOL_MAXSIZE
+            )
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def imdb_get(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """GET an IMDb URL through the shared async client, raising on HTTP errors.
+
+    Shares the rate limiter, retry policy and circuit breaker of addon.imdb_get.
+    """
+    kind = addon.url_kind(url)
+    attempt = 0
+    while True:
+        delay = addon.admit_imdb_request()
+        recorded = False
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                with addon.UPSTREAM_IN_FLIGHT.track():
+                    response = await get_client().get(url, headers=headers)
+            except httpx.HTTPError as e:
+                addon.observe_upstream(kind, start, 'error')
+                addon.record_fetch(ok=False)
+                addon.imdb_breaker.record_failure()
+                recorded = True
+                error = e
+            else:
+                addon.observe_upstream(kind, start, response.status_code)
+                if not addon.is_retryable_status(response.status_code):
+                    addon.imdb_breaker.record_success()
+                    recorded = True
+                    addon.record_fetch(ok=response.is_success or response.status_code == 304)
+                    if response.status_code != 304:  # httpx treats every non-2xx as an error
+                        response.raise_for_status()
+                    return response
+                addon.record_fetch(ok=False)
+                retry_after = addon.parse_retry_after(response.headers.get('Retry-After'))
+                addon.imdb_breaker.record_failure(retry_after)
+                recorded = True
+                error = httpx.HTTPStatusError(f"{response.status_code} from IMDb for url: {url}",
+                                              request=response.request, response=response)
+        finally:
+            if not recorded:
+                # Cancelled or interrupted before an outcome; don't leave a half-open probe claimed
+                addon.imdb_breaker.release_probe()
+
+        delay = addon.backoff_delay(attempt, retry_after)
+        if delay is None:
+            raise addon.UpstreamUnavailable(str(error)) from error
+        addon.count_fetch_event('retries')
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def _run_in_background(coro) -> None:
+    # Keep a reference so unfinished tasks are not garbage collected
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def single_flight(flights: Dict[Hashable, asyncio.Task], counter, key: Hashable,
+                        load: Callable[[], Awaitable[Any]]) -> Any:
+    """Await the load already in flight for key, or start it; counted in addon's SingleFlight stats."""
+    task = flights.get(key)
+    counter.record(coalesced=task is not None)
+    if task is None:
+        task = asyncio.ensure_future(load())
+        flights[key] = task
+        task.add_done_callback(lambda _: flights.pop(key, None))
+    # Shielded so one cancelled caller doesn't cancel the fetch for everyone else
+    return await asyncio.shield(task)
+
+
+async def fetch_page(id: str):
+    """Fetch the guide page, revalidating the stored copy when there is one.
+
+    Returns the result type, the page HTML and whether it changed since the stored copy.
+    """
+    stored = await asyncio.to_thread(addon.read_page, id)
+    try:
+        response = await imdb_get(addon.guide_url(id), headers=stored.validators() if stored else None)
+    except addon.UpstreamUnavailable:
+        raise
+    except Exception as e:
+        if addon.is_not_found(e):
+            logger.info(f"No guide page for ID {id}")
+            return addon.GUIDE_NOT_FOUND, None, True
+        logger.error(f"Error in get_soup for ID {id}: {e}")
+        return addon.GUIDE_ERROR, None, True
+    return (addon.GUIDE_PARSED, *await asyncio.to_thread(
+        addon.revalidate_page, id, stored, response.status_code, response.content, response.headers))
+
+
+async def fetch_guide(id: str):
+    """Fetch and parse the guide page, returning the result type and the soup if parsed."""
+    status, content, _ = await fetch_page(id)
+    return status, await asyncio.to_thread(addon.parse_guide_page, content)
+
+
+async def get_soup(id: str):
+    """Get BeautifulSoup object for IMDb parental guide page."""
+    return (await fetch_guide(id))[1]
+
+
+async def scrape_movie(id: str, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Scrape movie/series content advisory information including age certification."""
+    status, content, changed = await fetch_page(id)
+    if previous is not None and not changed:
+        return previous
+    return await asyncio.to_thread(build_guide_record, id, content, status)
+
+
+def build_guide_record(id: str, content: Optional[bytes], status: str) -> Dict[str, Any]:
+    return addon.build_guide_record(id, addon.parse_guide_page(content), status)
+
+
+async def get_parsed_guide(imdb_id: str) -> Dict[str, Any]:
+    """Get the parsed guide record for a title from the shared cache, scraping it on a miss."""
+    data = await asyncio.to_thread(addon.lookup_guide, imdb_id)
+    if data is not None:
+        return data
+    return await single_flight(_guide_flights, addon.guide_flight, imdb_id, lambda: load_guide(imdb_id))
+
+
+async def load_guide(imdb_id: str) -> Dict[str, Any]:
+    record = await asyncio.to_thread(addon.read_guide_record, imdb_id)
+    if record is not None and addon.is_fresh(record):
+        return addon.guide_from_record(record)
+    try:
+        with addon.SCRAPES_IN_FLIGHT.track():
+            data = await scrape_movie(imdb_id, addon.parsed_guide(record))
+        return await asyncio.to_thread(addon.store_guide, imdb_id, data)
+    except addon.UpstreamUnavailable as e:
+        return await asyncio.to_thread(addon.fallback_guide, imdb_id, record, e)
+
+
+async def get_age_rating_for_content(imdb_id: str) -> Optional[int]:
+    return (await get_parsed_guide(imdb_id)).get('age_rating', None)
+
+
+async def resolve_guides(imdb_ids: List[str], deadline: float = None) -> List[Any]:
+    """Resolve parsed guides concurrently in input order; titles unresolved at the deadline are PENDING."""
+    deadline = addon.CATALOG_DEADLINE if deadline is None else deadline
+    semaphore = asyncio.Semaphore(ASYNC_SCRAPE_CONCURRENCY)
+
+    async def resolve(imdb_id: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await get_parsed_guide(imdb_id)
+
+    tasks = {}
+    for imdb_id in imdb_ids:
+        if imdb_id not in tasks:
+            tasks[imdb_id] = asyncio.ensure_future(resolve(imdb_id))
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+    results = []
+    for imdb_id in imdb_ids:
+        task = tasks[imdb_id]
+        if not task.done():
+            # Let it finish in the background so the cache is warm next time
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+            results.append(addon.PENDING)
+        elif task.exception():
+            logger.error(f"Error resolving guide for ID {imdb_id}: {task.exception()}")
+            results.append(None)
+        else:
+            results.append(task.result())
+    return results
+
+
+async def get_season_index(series: str, season: str) -> Optional[Dict[str, str]]:
+    index = await asyncio.to_thread(addon.get_cached_season_index, series, season)
+    addon.CACHE_LOOKUPS.inc('season', 'miss' if index is None else 'hit')
+    if index is not None:
+        return index
+    return await single_flight(_season_flights, addon.season_flight, (series, season),
+                               lambda: load_season_index(series, season))
+
+
+async def load_season_index(series: str, season: str) -> Optional[Dict[str, str]]:
+    index = await asyncio.to_thread(addon.get_cached_season_index, series, season)
+    if index is not None:
+        return index
+    response = await imdb_get(addon.season_index_url(series, season))
+    return await asyncio.to_thread(store_season_index, series, season, response.content)
+
+
+def store_season_index(series: str, season: str, content: bytes) -> Optional[Dict[str, str]]:
+    return addon.store_season_index(series, season, addon.parse_season_index(content, series, season))
+
+
+async def getEpId(seriesID: str) -> Optional[str]:
+    """Get episode ID for a series."""
+    try:
+        parsed = addon.parse_series_id(seriesID)
+        if not parsed:
+            return None
+        series, season, episode = parsed
+        return addon.lookup_episode(await get_season_index(series, season), series, episode)
+    except Exception as e:
+        logger.error(f"Error in getEpId for seriesID {seriesID}: {e}")
+        return None
+
+
+async def fetch_imdb_popular(content_type: str) -> List[Dict[str, str]]:
+    """Fetch popular content from IMDb."""
+    try:
+        response = await imdb_get(addon.chart_url(content_type))
+        return await asyncio.to_thread(addon.parse_chart, response.content, content_type)
+    except Exception as e:
+        logger.error(f"Error fetching IMDb popular content: {e}")
+        return []
+
+
+async def search_imdb(query: str, content_type: str) -> List[Dict[str, str]]:
+    """Search IMDb for content."""
+    try:
+        response = await imdb_get(addon.search_url(query, content_type))
+        return await asyncio.to_thread(addon.parse_search_results, response.content, query, content_type)
+    except Exception as e:
+        logger.error(f"Error searching IMDb: {e}")
+        return []
+
+
+async def get_catalog_items(catalog_id: str, key: str, fetch) -> List[Dict[str, str]]:
+    """Get chart or search results, serving stale entries while they refresh in the background.
+
+    `fetch` is a zero-argument coroutine function.
+    """
+    entry = await asyncio.to_thread(addon.read_catalog_entry, key)
+    if entry is None:
+        return await asyncio.to_thread(addon.store_catalog_items, catalog_id, key, await fetch())
+    if entry['fresh_until'] <= time.time() and addon.claim_catalog_refresh(key):
+        async def refresh():
+            try:
+                await asyncio.to_thread(addon.store_catalog_items, catalog_id, key, await fetch())
+            except Exception as e:
+                logger.error(f"Error refreshing catalog {key}: {e}")
+            finally:
+                addon.release_catalog_refresh(key)
+
+        _run_in_background(refresh())
+    return entry['items']
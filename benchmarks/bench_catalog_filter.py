@@ -0,0 +1,83 @@
+# benchmarks/bench_catalog_filter.py
+"""Compare per-item catalog filtering with the column filter at large catalog sizes.
+
+Builds a synthetic catalog of resolved guides with random ages and severities, checks that
+both paths return the same metas for several profiles, then times one request of each.
+
+Usage: python benchmarks/bench_catalog_filter.py [--items N] [--rounds N]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import addon
+
+SEVERITIES = ['none', 'None', 'Mild', 'Moderate', 'Severe']
+PROFILES = ['', 'age=10', 'age=13|violence=moderate', 'age=18|nudity=none|profanity=mild|frightening=moderate']
+
+
+def synthetic_catalog(count: int):
+    rng = random.Random(42)
+    items, guides = [], []
+    for number in range(count):
+        items.append({'id': f'tt{5000000 + number}', 'title': f'Title {number}'})
+        if rng.random() < 0.02:
+            guides.append(None)  # Failed resolution
+            continue
+        guides.append({
+            'title': f'Title {number}',
+            'age_rating': rng.choice([6, 7, 8, 10, 13, 16, 17, 18]),
+            'raw_ratings': {
+                'content_categories': {category: rng.choice(SEVERITIES) for category in addon.GUIDE_CATEGORIES}
+            }
+        })
+    return items, guides
+
+
+def filter_per_item(type: str, items, guides, profile):
+    """The per-item loop the catalog route used before columns."""
+    metas = []
+    for item, guide in zip(items, guides):
+        if guide is None or not addon.is_allowed(guide, profile):
+            continue
+        metas.append({'id': f"gpg-{item['id']}", 'type': type, 'name': item['title'], 'ageRating': guide['age_rating']})
+    return metas
+
+
+def timed(func, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000, help='catalog size')
+    parser.add_argument('--rounds', type=int, default=50, help='requests timed per profile')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    items, guides = synthetic_catalog(args.items)
+    build_ms = timed(lambda: addon.build_catalog_columns('movie', items, guides), 5)
+    columns = addon.build_catalog_columns('movie', items, guides)
+
+    print(f"{args.items} items, columns built once in {build_ms:.2f} ms")
+    print(f"{'profile':<58}{'kept':>7}{'per-item ms':>13}{'columns ms':>12}{'speedup':>9}")
+    for config in PROFILES:
+        profile = addon.parse_profile(config)
+        expected = filter_per_item('movie', items, guides, profile)
+        if addon.filter_catalog(columns, profile) != expected:
+            sys.exit(f"Column filter mismatch for profile '{config}'")
+        per_item = timed(lambda: filter_per_item('movie', items, guides, profile), args.rounds)
+        vectorized = timed(lambda: addon.filter_catalog(columns, profile), args.rounds)
+        print(f"{config or '(default)':<58}{len(expected):>7}{per_item:>13.3f}{vectorized:>12.3f}{per_item / vectorized:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
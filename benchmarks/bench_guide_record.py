@@ -0,0 +1,85 @@
+# benchmarks/bench_guide_record.py
+"""Compare the memory footprint and serialization cost of dict guide records and GuideRecord.
+
+Scrapes the fixture guide pages once, then holds N copies of the records in each form:
+the scrape_movie dict, a GuideRecord and its serialized bytes.
+
+Usage: python benchmarks/bench_guide_record.py [--titles N] [--rounds N]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import addon
+from guide_record import GuideRecord
+from stub_server import start_stub_server
+
+GUIDE_IDS = ['tt0910970', 'tt0110912', 'tt1375666', 'tt0068646', 'tt0903747', 'tt9999999']
+
+
+def footprint(build) -> float:
+    """Bytes allocated and still held by the object build() returns."""
+    tracemalloc.start()
+    held = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def timed(func, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=10000, help='records held in memory')
+    parser.add_argument('--rounds', type=int, default=2000, help='serialization rounds per record')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    server = start_stub_server()
+    addon.IMDB_BASE_URL = server.base_url
+    guides = [addon.scrape_movie(imdb_id) for imdb_id in GUIDE_IDS]
+    server.shutdown()
+    for guide in guides:
+        if GuideRecord.from_bytes(GuideRecord.from_dict(guide).to_bytes()).to_dict() != guide:
+            sys.exit(f"Round trip mismatch for {guide['title']}")
+
+    # Each copy is decoded from JSON so no strings are shared between titles, as with real scrapes
+    blobs = [json.dumps(guide) for guide in guides]
+    def copies():
+        return (json.loads(blobs[i % len(blobs)]) for i in range(args.titles))
+
+    sizes = {
+        'dict': footprint(lambda: list(copies())),
+        'GuideRecord': footprint(lambda: [GuideRecord.from_dict(guide) for guide in copies()]),
+        'bytes': footprint(lambda: [GuideRecord.from_dict(guide).to_bytes() for guide in copies()]),
+    }
+    print(f"{args.titles} titles held in memory")
+    for name, size in sizes.items():
+        print(f"{name:<14}{size / 2**20:10.2f} MiB{size / args.titles:10.0f} B/title{sizes['dict'] / size:8.1f}x")
+
+    records = [GuideRecord.from_dict(guide) for guide in guides]
+    encoded = [record.to_bytes() for record in records]
+    json_encoded = [blob.encode('utf-8') for blob in blobs]
+    print(f"\nserialization, {args.rounds} rounds, us/record")
+    print(f"{'json':<14}{'encode':>8}{timed(lambda: [json.dumps(g).encode() for g in guides], args.rounds) / len(guides):8.1f}"
+          f"{'decode':>8}{timed(lambda: [json.loads(b) for b in json_encoded], args.rounds) / len(guides):8.1f}"
+          f"{'size':>8}{sum(map(len, json_encoded)) / len(guides):8.0f} B")
+    print(f"{'GuideRecord':<14}{'encode':>8}{timed(lambda: [r.to_bytes() for r in records], args.rounds) / len(guides):8.1f}"
+          f"{'decode':>8}{timed(lambda: [GuideRecord.from_bytes(b).to_dict() for b in encoded], args.rounds) / len(guides):8.1f}"
+          f"{'size':>8}{sum(map(len, encoded)) / len(guides):8.0f} B")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_parser.py
+"""Compare the full html5lib parse with the configured parser on the synthetic fixture guide pages.
+
+Usage: python benchmarks/bench_parser.py [rounds]
+"""
+import glob
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import addon
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def extract(soup: BeautifulSoup) -> dict:
+    """Run the extraction the scrape path uses."""
+    return addon.extract_guide(soup)
+
+
+def bench(name: str, parse, pages: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for content in pages:
+            extract(parse(content))
+    elapsed = (time.perf_counter() - start) / (rounds * len(pages))
+    print(f"{name:<32} {elapsed * 1000:8.2f} ms/page")
+    return elapsed
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    logging.disable(logging.WARNING)
+    paths = sorted(glob.glob(os.path.join(FIXTURES, 'guide_*.html')))
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+
+    # Both paths must extract the same data before timing means anything
+    for path, content in zip(paths, pages):
+        if extract(BeautifulSoup(content, 'html5lib')) != extract(addon.parse_html(content, addon.GUIDE_STRAINER)):
+            sys.exit(f"Extraction mismatch for {os.path.basename(path)}")
+
+    print(f"{len(pages)} pages, {rounds} rounds, parser={addon.HTML_PARSER}")
+    baseline = bench('html5lib (full tree)', lambda c: BeautifulSoup(c, 'html5lib'), pages, rounds)
+    full = bench(f'{addon.HTML_PARSER} (full tree)', lambda c: BeautifulSoup(c, addon.HTML_PARSER), pages, rounds)
+    targeted = bench(f'{addon.HTML_PARSER} (guide subtrees)', lambda c: addon.parse_html(c, addon.GUIDE_STRAINER), pages, rounds)
+    print(f"speedup vs html5lib: full {baseline / full:.1f}x, subtrees {baseline / targeted:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+# benchmarks/bench_pipeline.py
+"""Benchmark the full scrape pipeline against the offline fixture server.
+
+Runs scrape_movie, getEpId, search_imdb and fetch_imdb_popular through the real
+HTTP session, against benchmarks/stub_server.py, and reports p50/p95/p99 latency per stage
+(fetch, parse, extract, rate) and throughput per operation. No network access needed.
+
+Usage: python benchmarks/bench_pipeline.py [--iterations N] [--concurrency N] [--latency SECONDS] [--json]
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import addon
+from guide_cache import MemoryLRUCache
+from stub_server import start_stub_server
+from throttle import TokenBucket
+
+STAGES = ('fetch', 'parse', 'extract', 'rate')
+GUIDE_IDS = ['tt0910970', 'tt0110912', 'tt1375666', 'tt0068646', 'tt0903747']
+NO_GUIDE_ID = 'tt9999999'  # Fixture page without a parental guide
+
+_current = threading.local()
+
+
+def _timed(stage: str, func: Callable) -> Callable:
+    """Wrap a pipeline function so its time is charged to a stage of the running operation."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stages = getattr(_current, 'stages', None)
+            if stages is not None:
+                stages[stage] += time.perf_counter() - start
+    return wrapper
+
+
+def instrument():
+    addon.imdb_get = _timed('fetch', addon.imdb_get)
+    addon.parse_html = _timed('parse', addon.parse_html)
+    addon.extract_guide = _timed('extract', addon.extract_guide)
+    addon.calculate_content_age_rating = _timed('rate', addon.calculate_content_age_rating)
+    addon.calculate_age_certificates_rating = _timed('rate', addon.calculate_age_certificates_rating)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def has_guide(imdb_id: str) -> bool:
+    guide = addon.scrape_movie(imdb_id)
+    return guide['status'] == addon.GUIDE_PARSED and bool(guide['raw_ratings'])
+
+
+def has_no_guide(imdb_id: str) -> bool:
+    guide = addon.scrape_movie(imdb_id)
+    return guide['status'] == addon.GUIDE_NOT_FOUND and guide['age_rating'] is None
+
+
+def operations() -> Dict[str, List[Callable[[], bool]]]:
+    """Each operation is a list of calls returning whether the result looks right."""
+    return {
+        'scrape_movie': [
+            (lambda imdb_id=imdb_id: has_guide(imdb_id)) for imdb_id in GUIDE_IDS
+        ] + [lambda: has_no_guide(NO_GUIDE_ID)],
+        'getEpId': [
+            lambda: addon.getEpId('tt0903747_1_3') == 'tt1054725',
+            lambda: addon.getEpId('tt0903747_2_13') == 'tt1232256',
+        ],
+        'search_imdb': [
+            lambda: len(addon.search_imdb('disney', 'movie')) == 20,
+            lambda: len(addon.search_imdb('drama', 'series')) == 20,
+        ],
+        'fetch_imdb_popular': [
+            lambda: len(addon.fetch_imdb_popular('movie')) == 50,
+            lambda: len(addon.fetch_imdb_popular('series')) == 50,
+        ],
+    }
+
+
+def run_operation(calls: List[Callable[[], bool]], iterations: int, concurrency: int) -> dict:
+    samples = []
+    errors = 0
+    lock = threading.Lock()
+
+    def run_one(index: int):
+        nonlocal errors
+        _current.stages = dict.fromkeys(STAGES, 0.0)
+        start = time.perf_counter()
+        ok = calls[index % len(calls)]()
+        total = time.perf_counter() - start
+        sample = dict(_current.stages, total=total)
+        _current.stages = None
+        with lock:
+            samples.append(sample)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run_one, range(iterations)))
+    wall = time.perf_counter() - start
+
+    report = {'ops': iterations, 'errors': errors, 'throughput': iterations / wall}
+    for stage in STAGES + ('total',):
+        values = [sample[stage] * 1000 for sample in samples]
+        if stage != 'total' and not any(values):
+            continue
+        report[stage] = {pct: round(percentile(values, n), 3) for pct, n in (('p50', 50), ('p95', 95), ('p99', 99))}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=60, help='calls per operation')
+    parser.add_argument('--concurrency', type=int, default=1, help='parallel callers')
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated upstream latency in seconds')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    server = start_stub_server(latency=args.latency)
+    addon.IMDB_BASE_URL = server.base_url
+    # A zero-size cache keeps every call on the upstream path being measured, and without
+    # stored pages every fetch is a full 200 rather than a 304 revalidation
+    addon.guide_cache = MemoryLRUCache(0)
+    addon.page_store = None
+    # The stub server doesn't need protecting from bursts
+    addon.imdb_bucket = TokenBucket(0, 1)
+    instrument()
+
+    # One warm-up pass so connection setup and imports don't skew p99
+    for calls in operations().values():
+        for call in calls:
+            call()
+
+    results = {
+        name: run_operation(calls, args.iterations, args.concurrency)
+        for name, calls in operations().items()
+    }
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"parser={addon.HTML_PARSER} iterations={args.iterations} concurrency={args.concurrency} latency={args.latency}s")
+        print(f"{'operation':<20}{'stage':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, report in results.items():
+            for stage in STAGES + ('total',):
+                if stage in report:
+                    p = report[stage]
+                    print(f"{name:<20}{stage:<10}{p['p50']:>10.2f}{p['p95']:>10.2f}{p['p99']:>10.2f}")
+            print(f"{name:<20}{'ops/s':<10}{report['throughput']:>10.1f}   errors: {report['errors']}")
+
+    if any(report['errors'] for report in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
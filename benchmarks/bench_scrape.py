@@ -0,0 +1,66 @@
+# benchmarks/bench_scrape.py
+"""Time scrape_movie on the synthetic fixture guide pages, with and without the old debug snippet and full logging.
+
+Usage: python benchmarks/bench_scrape.py [rounds]
+"""
+import glob
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import addon
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_pages() -> dict:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, 'guide_*.html'))):
+        imdb_id = os.path.basename(path)[len('guide_'):-len('.html')]
+        with open(path, 'rb') as f:
+            pages[imdb_id] = f.read()
+    return pages
+
+
+def bench(name: str, pages: dict, rounds: int, legacy: bool) -> float:
+    def parse_guide_page(content):
+        soup = addon.parse_html(content, addon.GUIDE_STRAINER)
+        if legacy:
+            # What scrape_movie used to do on every call, whatever the log level
+            snippet = soup.prettify()[:1000]
+            addon.logger.debug(f"HTML Snippet:\n{snippet}")
+        return soup
+
+    addon.fetch_page = lambda imdb_id: (addon.GUIDE_PARSED, pages[imdb_id], True)
+    addon.parse_guide_page = parse_guide_page
+    addon.SCRAPE_LOG_SAMPLE_RATE = 1.0 if legacy else float(os.getenv('SCRAPE_LOG_SAMPLE_RATE', 0.1))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for imdb_id in pages:
+            addon.scrape_movie(imdb_id)
+    elapsed = (time.perf_counter() - start) / (rounds * len(pages))
+    print(f"{name:<40} {elapsed * 1000:8.2f} ms/scrape")
+    return elapsed
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Keep INFO enabled as in production, but write the log lines nowhere
+    devnull = open(os.devnull, 'w')
+    for log in (logging.getLogger(), addon.logger):
+        for handler in log.handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(devnull)
+
+    pages = load_pages()
+    print(f"{len(pages)} pages, {rounds} rounds, parser={addon.HTML_PARSER}")
+    before = bench('before (prettify + every log line)', pages, rounds, legacy=True)
+    after = bench('after (lazy, sampled logs)', pages, rounds, legacy=False)
+    print(f"speedup: {before / after:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/stub_server.py
+"""Local HTTP server that answers IMDb URLs from the synthetic pages in benchmarks/fixtures.
+
+Usage: python benchmarks/stub_server.py [port]
+then run the addon with IMDB_BASE_URL=http://127.0.0.1:<port>
+"""
+import gzip
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+GUIDE_PATH = re.compile(r'^/title/(tt\d+)/parentalguide/?$')
+EPISODES_PATH = re.compile(r'^/title/(tt\d+)/episodes/?$')
+CHART_PATH = re.compile(r'^/chart/(moviemeter|tvmeter)/?$')
+
+
+def fixture_for(path: str, query: dict) -> Optional[str]:
+    """Map an IMDb URL to the fixture file that stands in for it."""
+    match = GUIDE_PATH.match(path)
+    if match:
+        return f'guide_{match.group(1)}.html'
+    match = EPISODES_PATH.match(path)
+    if match:
+        season = query.get('season', ['1'])[0]
+        return f'episodes_{match.group(1)}_s{season}.html'
+    match = CHART_PATH.match(path)
+    if match:
+        return f'chart_{match.group(1)}.html'
+    if path.rstrip('/') == '/find':
+        return f"find_{query.get('ttype', ['ft'])[0]}.html"
+    return None
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like IMDb
+    disable_nagle_algorithm = True
+    latency = 0.0                  # Simulated upstream latency in seconds
+    _pages = {}
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        name = fixture_for(url.path, parse_qs(url.query))
+        body = self._load(name) if name else None
+        if self.latency:
+            time.sleep(self.latency)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _load(self, name: str) -> Optional[bytes]:
+        if name not in self._pages:
+            path = os.path.join(FIXTURES, name)
+            if not os.path.exists(path):
+                return None
+            with open(path, 'rb') as f:
+                self._pages[name] = f.read()
+        return self._pages[name]
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the fixture server on a background thread; its base URL is server.base_url."""
+    handler = type('Handler', (FixtureHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    server = start_stub_server(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Serving fixtures at {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,78 @@
+# catalog_columns.py
+"""Column form of a resolved catalog, filtered for a profile in a few C-level passes.
+
+Ages and per-category severity ranks are kept as one byte per item. A profile turns
+each column into a 0/1 mask with bytes.translate, the masks are ANDed as integers
+and itertools.compress picks the prebuilt metas, so no per-item Python code runs
+when a catalog is filtered.
+"""
+from functools import lru_cache
+from itertools import compress
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+UNRATED = 255   # No usable age rating: always filtered out
+MAX_AGE = 254
+
+
+@lru_cache(maxsize=64)
+def _at_most(limit: int) -> bytes:
+    """Translate table mapping byte values <= limit to 1 and everything else to 0."""
+    return bytes(1 if value <= limit else 0 for value in range(256))
+
+
+class CatalogColumns:
+    """Metas for the resolved titles of one catalog plus their age and severity columns."""
+
+    __slots__ = ('metas', 'ages', 'severities', 'pending', 'transient')
+
+    def __init__(self, metas: List[Dict[str, Any]], ages: bytes, severities: Dict[str, bytes],
+                 pending: int = 0, transient: int = 0):
+        self.metas = metas
+        self.ages = ages
+        self.severities = severities  # category -> one severity rank per meta
+        self.pending = pending        # Titles left out because they are still resolving
+        self.transient = transient    # Titles filtered out only because their guide couldn't be fetched
+
+    @classmethod
+    def build(cls, type: str, items: List[Dict[str, str]], guides: List[Any], categories: Iterable[str],
+              severity_ranks: Dict[str, int], pending_marker: Any = None,
+              is_transient: Optional[Callable[[Dict[str, Any]], bool]] = None) -> 'CatalogColumns':
+        """Build the columns from catalog items and their resolved guides (None for failures)."""
+        categories = list(categories)
+        metas = []
+        ages = bytearray()
+        severities = {category: bytearray() for category in categories}
+        pending = 0
+        transient = 0
+        for item, guide in zip(items, guides):
+            if guide is pending_marker:
+                pending += 1
+                continue
+            if guide is None or (is_transient and is_transient(guide)):
+                transient += 1
+            age_rating = guide.get('age_rating') if guide else None
+            metas.append({
+                'id': f"gpg-{item['id']}",
+                'type': type,
+                'name': item['title'],
+                'ageRating': age_rating
+            })
+            ages.append(UNRATED if age_rating is None else min(max(age_rating, 0), MAX_AGE))
+            content_categories = guide.get('raw_ratings', {}).get('content_categories', {}) if guide else {}
+            for category in categories:
+                severity = str(content_categories.get(category, 'none')).lower()
+                severities[category].append(severity_ranks.get(severity, 0))
+        return cls(metas, bytes(ages), {category: bytes(column) for category, column in severities.items()},
+                   pending, transient)
+
+    def filter(self, allowed_age: int, max_severity: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """Metas whose age is at most allowed_age and whose severities stay within max_severity."""
+        count = len(self.metas)
+        if not count:
+            return []
+        mask = int.from_bytes(self.ages.translate(_at_most(min(allowed_age, MAX_AGE))), 'little')
+        for category, max_rank in (max_severity or {}).items():
+            column = self.severities.get(category)
+            if column is not None:
+                mask &= int.from_bytes(column.translate(_at_most(max_rank)), 'little')
+        return list(compress(self.metas, mask.to_bytes(count, 'little')))
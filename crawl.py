@@ -0,0 +1,129 @@
+# crawl.py
+"""Crawl parental guides offline and build the rating index the addon loads at startup.
+
+Progress is appended to a state file as each title finishes, so an interrupted
+crawl picks up where it stopped when run again with the same --state.
+
+Usage: python crawl.py [--ids FILE] [--charts] [--output rating_index.bin] [--state crawl_state.tsv]
+                       [--workers N] [--rate PER_SECOND]
+then run the addon with RATING_INDEX_PATH=rating_index.bin
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import addon
+from rating_index import pack_record, write_index
+
+logger = logging.getLogger('crawl')
+
+UNAVAILABLE_RETRIES = 3  # Times a title waits out an open circuit breaker before it counts as failed
+
+
+def read_ids(path: str) -> List[str]:
+    """Read one IMDb ID per line, ignoring blank lines and # comments."""
+    with open(path) as f:
+        return [line.split('#')[0].strip() for line in f if line.split('#')[0].strip()]
+
+
+def read_state(path: str) -> Dict[str, bytes]:
+    """Read the packed records of titles crawled so far."""
+    records = {}
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            for line in f:
+                imdb_id, _, data = line.rstrip(b'\n').partition(b'\t')
+                if data:
+                    records[imdb_id.decode()] = data
+    return records
+
+
+class Pacer:
+    """Spaces calls from any number of threads to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def crawl(imdb_ids: List[str], state_path: str, workers: int, rate: float) -> Dict[str, int]:
+    done = read_state(state_path)
+    todo = [imdb_id for imdb_id in dict.fromkeys(imdb_ids) if imdb_id not in done]
+    logger.info(f"{len(done)} titles already crawled, {len(todo)} to go")
+
+    pacer = Pacer(rate)
+    lock = threading.Lock()
+    counts = {'crawled': 0, 'not_found': 0, 'failed': 0}
+
+    with open(state_path, 'ab') as state:
+        def crawl_one(imdb_id: str) -> None:
+            guide = {}
+            for attempt in range(UNAVAILABLE_RETRIES + 1):
+                pacer.wait()
+                try:
+                    guide = addon.scrape_movie(imdb_id)
+                    break
+                except addon.UpstreamUnavailable as e:
+                    # IMDb is throttling us; wait for the circuit breaker to let requests through again
+                    logger.warning(f"IMDb unavailable for {imdb_id}: {e}")
+                    if attempt < UNAVAILABLE_RETRIES:
+                        time.sleep(addon.IMDB_BREAKER_RESET)
+            with lock:
+                # Only parsed guides are indexed; missing and failed ones are left out of the
+                # state so the next run retries them, and only errors fail the crawl
+                status = addon.guide_status(guide)
+                if status != addon.GUIDE_PARSED:
+                    counts['not_found' if status == addon.GUIDE_NOT_FOUND else 'failed'] += 1
+                    return
+                state.write(imdb_id.encode() + b'\t' + pack_record(guide, addon.GUIDE_CATEGORIES) + b'\n')
+                state.flush()
+                counts['crawled'] += 1
+                if counts['crawled'] % 100 == 0:
+                    logger.info(f"Crawled {counts['crawled']}/{len(todo)} titles")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(crawl_one, todo))
+
+    counts['skipped'] = len(imdb_ids) - len(todo)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ids', help='file with one IMDb ID per line')
+    parser.add_argument('--charts', action='store_true', help='also crawl the titles on the movie and TV charts')
+    parser.add_argument('--output', default='rating_index.bin', help='index file to write')
+    parser.add_argument('--state', default='crawl_state.tsv', help='progress file used to resume')
+    parser.add_argument('--workers', type=int, default=4, help='parallel scrapes')
+    parser.add_argument('--rate', type=float, default=2, help='maximum scrapes per second')
+    args = parser.parse_args()
+
+    imdb_ids = read_ids(args.ids) if args.ids else []
+    if args.charts:
+        for content_type in ('movie', 'series'):
+            imdb_ids.extend(item['id'] for item in addon.fetch_imdb_popular(content_type))
+    if not imdb_ids:
+        parser.error('nothing to crawl: pass --ids and/or --charts')
+
+    counts = crawl(imdb_ids, args.state, args.workers, args.rate)
+    written = write_index(args.output, read_state(args.state))
+    logger.info(f"Crawl finished: {counts}; wrote {written} titles to {args.output}")
+    sys.exit(1 if counts['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
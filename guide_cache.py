@@ -0,0 +1,228 @@
+# guide_cache.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from guide_record import GuideRecord
+from page_store import RawPage
+
+try:
+    import redis
+except ImportError:  # Redis backend is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+# Serialized GuideRecords and RawPages are tagged so they can share a backend with JSON values
+RECORD_TAG = b'\x01'
+PAGE_TAG = b'\x02'
+
+# Seconds between recency updates of an SQLite entry; reads in between don't take the write lock
+SQLITE_TOUCH_INTERVAL = 60
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialize a cache value for the SQLite and Redis backends."""
+    if isinstance(value, GuideRecord):
+        return RECORD_TAG + value.to_bytes()
+    if isinstance(value, RawPage):
+        return PAGE_TAG + value.to_bytes()
+    return json.dumps(value).encode('utf-8')
+
+
+def decode_value(raw: Union[bytes, str]) -> Any:
+    if isinstance(raw, bytes) and raw[:1] == RECORD_TAG:
+        return GuideRecord.from_bytes(raw[1:])
+    if isinstance(raw, bytes) and raw[:1] == PAGE_TAG:
+        return RawPage.from_bytes(raw[1:])
+    return json.loads(raw)
+
+
+class MemoryLRUCache:
+    """In-process cache with a size bound and least-recently-used eviction."""
+
+    def __init__(self, max_size: int = 2048):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def ttl(self, key: str) -> Optional[float]:
+        """Seconds until key expires, or None if it is not cached."""
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None
+        remaining = entry[1] - time.time()
+        return remaining if remaining > 0 else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache:
+    """On-disk cache shared by every worker process on the same host."""
+
+    def __init__(self, path: str, max_size: int = 0):
+        self.path = path
+        self.max_size = max_size  # 0 disables the size bound
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS guide_cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS guide_cache_accessed ON guide_cache (accessed_at)')
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._conn()
+        row = conn.execute('SELECT value, expires_at, accessed_at FROM guide_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at <= now:
+            conn.execute('DELETE FROM guide_cache WHERE key = ?', (key,))
+            conn.commit()
+            return None
+        # Recency only orders evictions, so a minute's precision is enough
+        if self.max_size and now - accessed_at >= SQLITE_TOUCH_INTERVAL:
+            conn.execute('UPDATE guide_cache SET accessed_at = ? WHERE key = ?', (now, key))
+            conn.commit()
+        return decode_value(value)
+
+    def ttl(self, key: str) -> Optional[float]:
+        row = self._conn().execute('SELECT expires_at FROM guide_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        remaining = row[0] - time.time()
+        return remaining if remaining > 0 else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            'INSERT OR REPLACE INTO guide_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, sqlite3.Binary(encode_value(value)), now + ttl, now)
+        )
+        with self._writes_lock:
+            self._writes += 1
+            evict = self._writes % 100 == 0
+        if evict:
+            self._evict(conn, now)
+        conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute('DELETE FROM guide_cache WHERE expires_at <= ?', (now,))
+        if self.max_size:
+            conn.execute(
+                'DELETE FROM guide_cache WHERE key IN ('
+                'SELECT key FROM guide_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_size,)
+            )
+
+    def delete(self, key: str) -> None:
+        conn = self._conn()
+        conn.execute('DELETE FROM guide_cache WHERE key = ?', (key,))
+        conn.commit()
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute('DELETE FROM guide_cache')
+        conn.commit()
+
+
+class RedisCache:
+    """Cache shared by every worker and host pointing at the same Redis server."""
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', prefix: str = 'gpg:', client: Any = None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The redis package is required for the Redis cache backend")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        return decode_value(value)
+
+    def ttl(self, key: str) -> Optional[float]:
+        remaining = self.client.ttl(self.prefix + key)
+        return remaining if remaining is not None and remaining > 0 else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self.client.setex(self.prefix + key, ttl, encode_value(value))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+
+def create_cache(backend: Optional[str] = None, path: Optional[str] = None, max_size: Optional[int] = None,
+                 name: str = 'guide'):
+    """Create the cache backend selected by the GUIDE_CACHE_BACKEND environment variable.
+
+    name keeps caches sharing a Redis server apart, so clearing one leaves the others intact.
+    """
+    backend = (backend or os.getenv('GUIDE_CACHE_BACKEND', 'memory')).lower()
+    if max_size is None:
+        max_size = int(os.getenv('GUIDE_CACHE_SIZE', 2048))
+    try:
+        if backend == 'sqlite':
+            return SQLiteCache(path or os.getenv('GUIDE_CACHE_PATH', '/tmp/guide_cache.sqlite3'), max_size)
+        if backend == 'redis':
+            return RedisCache(os.getenv('REDIS_URL', 'redis://localhost:6379/0'), prefix=f'gpg:{name}:')
+    except Exception as e:
+        logger.error(f"Error creating {backend} cache, falling back to memory: {e}")
+        return MemoryLRUCache(max_size)
+    if backend != 'memory':
+        logger.warning(f"Unknown cache backend '{backend}', using memory.")
+    return MemoryLRUCache(max_size)
@@ -0,0 +1,273 @@
+# guide_record.py
+"""Compact in-memory and binary form of the parsed guide records built by scrape_movie.
+
+The dict form repeats every category comment inside content_description and keeps a
+fresh string for every severity and certificate. GuideRecord stores each comment
+once, severities as small integer codes and certificates as interned
+(country, rating) pairs, and rebuilds the dict form on demand.
+"""
+import struct
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+# Severity codes; anything else is kept as its text
+SEVERITIES = ('none', 'None', 'Mild', 'Moderate', 'Severe')
+SEVERITY_CODES = {name: code for code, name in enumerate(SEVERITIES)}
+OTHER_SEVERITY = 255
+
+FORMAT_VERSION = 3  # 3: a None age rating is stored as NO_AGE
+FAILED = 0x01     # A failed scrape: raw_ratings is empty and only the short record shape is used
+NOT_FOUND = 0x02  # The failure was a missing guide page rather than an error
+PARSED, NOT_FOUND_STATUS, ERROR = 'parsed', 'not_found', 'error'
+HEADER = struct.Struct('<BBhhd')
+HEADER_V1 = struct.Struct('<BBhh')  # Before fresh_until was stored
+NO_AGE = -1  # Also the certificates age of records without certificates in every version
+NONE_LENGTH = 0xFFFFFFFF
+
+
+def build_content_description(content_categories: Dict[str, str], mpa: Optional[str], age_rating: int,
+                              content_comments: Dict[str, str]) -> str:
+    """Compile the parents guide text shown in /meta."""
+    content_description = ""
+    for category, severity in content_categories.items():
+        formatted_category = category.replace('_', ' ').title()
+        content_description += f"[{formatted_category}]: {severity.capitalize()}\n"
+
+    #if age_certificates:
+    #    content_description += "\n[Age Certificates]\n"
+    #    for country, rating in age_certificates.items():
+    #        content_description += f"{country}: {rating}\n"
+    content_description += f"\n[MPA]: {mpa}\n"
+    content_description += f"\n[Age]: {age_rating}\n"
+
+    for category, comments in content_comments.items():
+        formatted_category = category.replace('_', ' ').title()
+        content_description += f"\n[{formatted_category}]:\n{comments}\n"
+    return content_description
+
+
+class GuideRecord:
+    """A parsed guide with severities as codes, interned certificates and comments stored once."""
+
+    __slots__ = ('title', 'age_rating', 'certificates_age_rating', 'mpa_rating',
+                 'severities', 'certificates', 'comments', 'description', 'status', 'fresh_until')
+
+    def __init__(self, title: Optional[str], age_rating: int, certificates_age_rating: Optional[int] = None,
+                 mpa_rating: Optional[str] = None, severities: Tuple = (), certificates: Tuple = (),
+                 comments: Tuple = (), description: Optional[str] = None, status: str = PARSED,
+                 fresh_until: float = 0.0):
+        self.title = title
+        self.age_rating = age_rating
+        self.certificates_age_rating = certificates_age_rating
+        self.mpa_rating = mpa_rating
+        self.severities = severities           # ((category, code or text), ...)
+        self.certificates = certificates       # ((country, rating), ...), interned
+        self.comments = comments               # ((category, text), ...)
+        self.description = description         # Only set when it can't be rebuilt from the fields above
+        self.status = status                   # parsed, not_found or error
+        self.fresh_until = fresh_until         # Epoch seconds after which the record is stale; 0 never goes stale
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GuideRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    @property
+    def failed(self) -> bool:
+        return self.status != PARSED
+
+    def __repr__(self) -> str:
+        return f"GuideRecord(title={self.title!r}, age_rating={self.age_rating!r})"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'GuideRecord':
+        """Build a record from the dict returned by scrape_movie."""
+        raw_ratings = data.get('raw_ratings') or {}
+        status = data.get('status') or (PARSED if raw_ratings else ERROR)
+        if status != PARSED or not raw_ratings:
+            return cls(data.get('title'), data.get('age_rating'),
+                       description=data.get('content_description'), status=status if status != PARSED else ERROR)
+
+        content_categories = raw_ratings.get('content_categories', {})
+        content_comments = data.get('content_comments', {})
+        record = cls(
+            title=data.get('title'),
+            age_rating=data.get('age_rating'),
+            certificates_age_rating=data.get('certificates_age_rating'),
+            mpa_rating=raw_ratings.get('mpa_rating'),
+            severities=tuple(
+                (sys.intern(category), SEVERITY_CODES.get(severity, severity))
+                for category, severity in content_categories.items()
+            ),
+            certificates=tuple(
+                (sys.intern(country), sys.intern(rating))
+                for country, rating in raw_ratings.get('age_certificates', {}).items()
+            ),
+            comments=tuple((sys.intern(category), text) for category, text in content_comments.items())
+        )
+        description = data.get('content_description')
+        if description != build_content_description(content_categories, record.mpa_rating,
+                                                     record.age_rating, content_comments):
+            record.description = description
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rebuild the dict form returned by scrape_movie."""
+        if self.failed:
+            return {
+                "content_description": self.description,
+                "title": self.title,
+                "age_rating": self.age_rating,
+                "raw_ratings": {},
+                "status": self.status
+            }
+
+        content_categories = {
+            category: SEVERITIES[severity] if isinstance(severity, int) else severity
+            for category, severity in self.severities
+        }
+        content_comments = dict(self.comments)
+        description = self.description
+        if description is None:
+            description = build_content_description(content_categories, self.mpa_rating, self.age_rating, content_comments)
+        return {
+            "content_description": description,
+            "title": self.title,
+            "age_rating": self.age_rating,
+            "certificates_age_rating": self.certificates_age_rating,
+            "content_comments": content_comments,
+            "raw_ratings": {
+                'mpa_rating': self.mpa_rating,
+                'content_categories': content_categories,
+                'age_certificates': dict(self.certificates)
+            },
+            "status": self.status
+        }
+
+    def to_bytes(self) -> bytes:
+        """Serialize for the SQLite and Redis cache backends."""
+        age = NO_AGE if self.age_rating is None else self.age_rating
+        certificates_age = NO_AGE if self.certificates_age_rating is None else self.certificates_age_rating
+        flags = 0
+        if self.failed:
+            flags |= FAILED
+        if self.status == NOT_FOUND_STATUS:
+            flags |= NOT_FOUND
+        parts = [HEADER.pack(FORMAT_VERSION, flags, age, certificates_age, self.fresh_until)]
+        _pack_text(parts, self.title)
+        _pack_text(parts, self.mpa_rating)
+        _pack_text(parts, self.description)
+
+        parts.append(struct.pack('<B', len(self.severities)))
+        for category, severity in self.severities:
+            _pack_name(parts, category)
+            if isinstance(severity, int):
+                parts.append(struct.pack('<B', severity))
+            else:
+                parts.append(struct.pack('<B', OTHER_SEVERITY))
+                _pack_text(parts, severity)
+
+        parts.append(struct.pack('<H', len(self.certificates)))
+        for country, rating in self.certificates:
+            _pack_name(parts, country)
+            _pack_name(parts, rating)
+
+        parts.append(struct.pack('<B', len(self.comments)))
+        for category, text in self.comments:
+            _pack_name(parts, category)
+            _pack_text(parts, text)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'GuideRecord':
+        """Deserialize a record written by to_bytes."""
+        version = data[0]
+        if version == FORMAT_VERSION or version == 2:
+            version, flags, age_rating, certificates_age, fresh_until = HEADER.unpack_from(data, 0)
+            offset = HEADER.size
+        elif version == 1:
+            version, flags, age_rating, certificates_age = HEADER_V1.unpack_from(data, 0)
+            fresh_until = 0.0
+            offset = HEADER_V1.size
+        else:
+            raise ValueError(f"Unsupported guide record version {version}")
+        title, offset = _unpack_text(data, offset)
+        mpa_rating, offset = _unpack_text(data, offset)
+        description, offset = _unpack_text(data, offset)
+
+        severities = []
+        count = data[offset]
+        offset += 1
+        for _ in range(count):
+            category, offset = _unpack_name(data, offset)
+            severity = data[offset]
+            offset += 1
+            if severity == OTHER_SEVERITY:
+                severity, offset = _unpack_text(data, offset)
+            severities.append((category, severity))
+
+        certificates = []
+        count, = struct.unpack_from('<H', data, offset)
+        offset += 2
+        for _ in range(count):
+            country, offset = _unpack_name(data, offset)
+            rating, offset = _unpack_name(data, offset)
+            certificates.append((country, rating))
+
+        comments = []
+        count = data[offset]
+        offset += 1
+        for _ in range(count):
+            category, offset = _unpack_name(data, offset)
+            text, offset = _unpack_text(data, offset)
+            comments.append((category, text))
+
+        if not flags & FAILED:
+            status = PARSED
+        else:
+            status = NOT_FOUND_STATUS if flags & NOT_FOUND else ERROR
+        if version < 3 and flags & FAILED:
+            # Older versions stored failures with an age of 0; failures are unrated now
+            age_rating = NO_AGE
+        return cls(
+            title=title,
+            age_rating=None if age_rating == NO_AGE else age_rating,
+            certificates_age_rating=None if certificates_age == NO_AGE else certificates_age,
+            mpa_rating=mpa_rating,
+            severities=tuple(severities),
+            certificates=tuple(certificates),
+            comments=tuple(comments),
+            description=description,
+            status=status,
+            fresh_until=fresh_until
+        )
+
+
+def _pack_name(parts: list, name: str) -> None:
+    # Short, frequently repeated strings: category keys, countries and certificate codes
+    encoded = name.encode('utf-8')
+    parts.append(struct.pack('<B', len(encoded)))
+    parts.append(encoded)
+
+
+def _unpack_name(data: bytes, offset: int) -> Tuple[str, int]:
+    length = data[offset]
+    offset += 1
+    return sys.intern(data[offset:offset + length].decode('utf-8')), offset + length
+
+
+def _pack_text(parts: list, text: Optional[str]) -> None:
+    if text is None:
+        parts.append(struct.pack('<I', NONE_LENGTH))
+        return
+    encoded = text.encode('utf-8')
+    parts.append(struct.pack('<I', len(encoded)))
+    parts.append(encoded)
+
+
+def _unpack_text(data: bytes, offset: int) -> Tuple[Optional[str], int]:
+    length, = struct.unpack_from('<I', data, offset)
+    offset += 4
+    if length == NONE_LENGTH:
+        return None, offset
+    return data[offset:offset + length].decode('utf-8'), offset + length
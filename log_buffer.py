@@ -0,0 +1,71 @@
+# log_buffer.py
+"""In-memory ring buffer of recent log records, read by /logs with a sequence cursor.
+
+Every record gets an increasing sequence number, so a poll asks for the records after
+the last one it saw and only the new lines are sent. Waiters are woken on each new
+record for the server-sent-events tail.
+"""
+import logging
+import threading
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` records as small dicts."""
+
+    def __init__(self, capacity: int = 1000, level: int = logging.NOTSET):
+        super().__init__(level)
+        self._records = deque(maxlen=capacity)
+        self._seq = 0
+        self._changed = threading.Condition()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._changed:
+            self._seq += 1
+            self._records.append({
+                'seq': self._seq,
+                'time': record.created,
+                'level': record.levelname,
+                'logger': record.name,
+                'message': message
+            })
+            self._changed.notify_all()
+
+    @property
+    def last_seq(self) -> int:
+        with self._changed:
+            return self._seq
+
+    def since(self, seq: Optional[int] = None, limit: int = 100) -> Tuple[List[Dict[str, Any]], bool]:
+        """Records after seq, oldest first and at most limit of them.
+
+        Without seq the newest `limit` records are returned. The flag is True when records
+        after seq have already been dropped from the buffer.
+        """
+        with self._changed:
+            if seq is None:
+                return list(self._records)[-limit:] if limit else [], False
+            return self._after(seq, limit)
+
+    def wait_since(self, seq: int, timeout: float, limit: int = 100) -> Tuple[List[Dict[str, Any]], bool]:
+        """Like since(), but waits up to timeout seconds for a record after seq."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._seq > seq, timeout)
+            return self._after(seq, limit)
+
+    def _after(self, seq: int, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        if seq > self._seq:
+            seq = 0  # A cursor from before a restart
+        # The records after seq are the newest ones, so read them from the right
+        count = max(self._seq - seq, 0)
+        dropped = count > len(self._records)
+        records = list(islice(reversed(self._records), min(count, len(self._records))))
+        records.reverse()
+        return (records[:limit] if limit else records), dropped
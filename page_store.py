@@ -0,0 +1,80 @@
+# page_store.py
+"""Compressed copies of fetched guide pages, kept to revalidate them cheaply.
+
+Each page is stored with the ETag and Last-Modified IMDb sent and a hash of its body.
+A refresh sends them back as If-None-Match / If-Modified-Since, and a 304 or a body
+with the same hash means the cached guide can be reused without parsing the page.
+"""
+import hashlib
+import struct
+import time
+import zlib
+from typing import Dict, Mapping, Optional, Tuple
+
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<Bd16s')  # version, fetched_at, digest
+COMPRESS_LEVEL = 6
+
+
+def content_digest(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+class RawPage:
+    """A fetched page body, zlib-compressed, with its validators and content hash."""
+
+    __slots__ = ('etag', 'last_modified', 'digest', 'body', 'fetched_at')
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], digest: bytes, body: bytes,
+                 fetched_at: float = 0.0):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest          # Hash of the uncompressed body
+        self.body = body              # zlib-compressed page
+        self.fetched_at = fetched_at  # Epoch seconds the body was last confirmed current
+
+    @classmethod
+    def from_response(cls, content: bytes, headers: Mapping[str, str]) -> 'RawPage':
+        """Build a page from a decoded response body and its headers."""
+        return cls(headers.get('ETag'), headers.get('Last-Modified'), content_digest(content),
+                   zlib.compress(content, COMPRESS_LEVEL), time.time())
+
+    @property
+    def content(self) -> bytes:
+        return zlib.decompress(self.body)
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that revalidate this page."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_bytes(self) -> bytes:
+        """Serialize for the SQLite and Redis cache backends."""
+        parts = [HEADER.pack(FORMAT_VERSION, self.fetched_at, self.digest)]
+        for text in (self.etag, self.last_modified):
+            encoded = (text or '').encode('latin-1')
+            parts.append(struct.pack('<H', len(encoded)))
+            parts.append(encoded)
+        parts.append(self.body)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'RawPage':
+        """Deserialize a page written by to_bytes."""
+        version, fetched_at, digest = HEADER.unpack_from(data, 0)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported raw page version {version}")
+        offset = HEADER.size
+        etag, offset = _unpack_header(data, offset)
+        last_modified, offset = _unpack_header(data, offset)
+        return cls(etag, last_modified, digest, data[offset:], fetched_at)
+
+
+def _unpack_header(data: bytes, offset: int) -> Tuple[Optional[str], int]:
+    length, = struct.unpack_from('<H', data, offset)
+    offset += 2
+    return data[offset:offset + length].decode('latin-1') or None, offset + length
@@ -0,0 +1,133 @@
+# profiler.py
+"""Wall-clock stack sampler for profiling single requests.
+
+A sampler thread records the stacks of the profiled threads every few milliseconds,
+so time spent waiting on IMDb shows up next to parsing, regex scans and JSON
+encoding. Stacks are kept collapsed (`outer;inner;leaf count`), the input format of
+flamegraph.pl and speedscope.
+"""
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional
+
+_profile_ids = itertools.count(1)
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame, root: str) -> str:
+    """Collapsed stack for a frame, outermost call first."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(root)
+    return ';'.join(reversed(labels))
+
+
+class Profile:
+    """Samples collected for one request."""
+
+    def __init__(self, route: str):
+        self.id = str(next(_profile_ids))
+        self.route = route
+        self.started = time.time()
+        self.duration = 0.0
+        self.samples = 0
+        self.stacks = Counter()
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            'id': self.id,
+            'route': self.route,
+            'started': self.started,
+            'duration_ms': round(self.duration * 1000, 1),
+            'samples': self.samples
+        }
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class StackSampler:
+    """Samples one thread, plus worker threads while they run work it handed them, until stopped."""
+
+    def __init__(self, profile: Profile, thread_id: int, interval: float):
+        self.profile = profile
+        self.thread_id = thread_id
+        self.interval = interval
+        self._workers = {}  # Thread ident -> name, for workers running a traced call
+        self._workers_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f'profiler-{profile.id}', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def traced(self, fn: Callable) -> Callable:
+        """Wrap fn so the worker thread that runs it is sampled for as long as the call lasts.
+
+        Other work on the same pool, e.g. scrapes for concurrent requests, stays out of the profile.
+        """
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            thread = threading.current_thread()
+            with self._workers_lock:
+                self._workers[thread.ident] = thread.name
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._workers_lock:
+                    self._workers.pop(thread.ident, None)
+        return run
+
+    def sample(self) -> None:
+        frames = sys._current_frames()
+        stacks = self.profile.stacks
+        frame = frames.get(self.thread_id)
+        if frame is not None:
+            stacks[collapse(frame, 'request')] += 1
+        with self._workers_lock:
+            workers = list(self._workers.items())
+        for ident, name in workers:
+            frame = frames.get(ident)
+            if frame is not None:
+                stacks[collapse(frame, name)] += 1
+        self.profile.samples += 1
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        self.profile.duration = time.perf_counter() - self._started
+        return self.profile
+
+
+class ProfileStore:
+    """The most recent profiles, newest last."""
+
+    def __init__(self, keep: int):
+        self._profiles = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    def summaries(self) -> List[Dict[str, object]]:
+        with self._lock:
+            return [profile.summary() for profile in self._profiles]
@@ -0,0 +1,111 @@
+# rating_index.py
+"""Compact on-disk index of precomputed guide ratings, built by crawl.py.
+
+Layout (little-endian):
+    header   8-byte magic, uint32 record count
+    table    one (uint64 numeric IMDb ID, uint32 offset, uint32 length) row per title, sorted by ID
+    payload  one compact JSON array per title:
+             [age_rating, certificates_age_rating, title, mpa_rating, [severities...], {country: certificate}]
+
+Lookups binary-search the table in a read-only memory map, so opening an index
+costs no parsing and worker processes share its pages.
+"""
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+MAGIC = b'GPGIDX1\n'
+HEADER = struct.Struct('<8sI')
+ROW = struct.Struct('<QII')
+
+
+def _numeric_id(imdb_id: str) -> Optional[int]:
+    if not imdb_id.startswith('tt') or not imdb_id[2:].isdigit():
+        return None
+    return int(imdb_id[2:])
+
+
+def pack_record(guide: Dict[str, Any], categories: Iterable[str]) -> bytes:
+    """Encode the rating fields of a scrape_movie record; category comments are not kept."""
+    raw_ratings = guide.get('raw_ratings', {})
+    content_categories = raw_ratings.get('content_categories', {})
+    return json.dumps([
+        guide.get('age_rating'),
+        guide.get('certificates_age_rating'),
+        guide.get('title'),
+        raw_ratings.get('mpa_rating'),
+        [content_categories.get(category) for category in categories],
+        raw_ratings.get('age_certificates', {})
+    ], separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def unpack_record(data: bytes, categories: Iterable[str]) -> Dict[str, Any]:
+    """Decode a packed record into its rating fields."""
+    age_rating, certificates_age_rating, title, mpa, severities, age_certificates = json.loads(data)
+    return {
+        'age_rating': age_rating,
+        'certificates_age_rating': certificates_age_rating,
+        'title': title,
+        'mpa_rating': mpa,
+        'content_categories': {
+            category: severity for category, severity in zip(categories, severities) if severity is not None
+        },
+        'age_certificates': age_certificates
+    }
+
+
+def write_index(path: str, records: Dict[str, bytes]) -> int:
+    """Write packed records keyed by IMDb ID to path atomically; returns the number written."""
+    rows = sorted((_numeric_id(imdb_id), data) for imdb_id, data in records.items() if _numeric_id(imdb_id) is not None)
+    offset = HEADER.size + ROW.size * len(rows)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(rows)))
+        for numeric_id, data in rows:
+            f.write(ROW.pack(numeric_id, offset, len(data)))
+            offset += len(data)
+        for _, data in rows:
+            f.write(data)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+class RatingIndex:
+    """Read-only, memory-mapped view of an index written by write_index."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a rating index")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _row(self, position: int) -> Tuple[int, int, int]:
+        return ROW.unpack_from(self._map, HEADER.size + position * ROW.size)
+
+    def get(self, imdb_id: str) -> Optional[bytes]:
+        """Packed record for imdb_id, or None if the title is not indexed."""
+        numeric_id = _numeric_id(imdb_id)
+        if numeric_id is None:
+            return None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            row_id, offset, length = self._row(middle)
+            if row_id == numeric_id:
+                return self._map[offset:offset + length]
+            if row_id < numeric_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self) -> None:
+        self._map.close()
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import addon
+import async_scrape
+from guide_cache import MemoryLRUCache
+from stub_server import start_stub_server
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def run(coro):
+    """Run a coroutine on a fresh event loop, closing the async client it opened."""
+    async def with_client():
+        try:
+            return await coro
+        finally:
+            await async_scrape.close_client()
+    return asyncio.run(with_client())
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    """Keep the addon's log lines out of test output."""
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Point IMDb fetches at the fixture server, with empty guide cache and no page store."""
+    server = start_stub_server()
+    monkeypatch.setattr(addon, 'IMDB_BASE_URL', server.base_url)
+    monkeypatch.setattr(addon, 'guide_cache', MemoryLRUCache())
+    monkeypatch.setattr(addon, 'page_store', None)
+    yield server
+    server.shutdown()
@@ -0,0 +1,24 @@
+import addon
+import async_scrape
+from conftest import run
+
+
+GUIDE_IDS = ['tt0110912', 'tt0903747', 'tt9999999', 'tt0000404']
+
+
+def test_async_scrape_matches_sync(stub):
+    for imdb_id in GUIDE_IDS:
+        assert run(async_scrape.scrape_movie(imdb_id)) == addon.scrape_movie(imdb_id)
+
+
+def test_async_guides_are_cached(stub):
+    guide = run(async_scrape.get_parsed_guide('tt0110912'))
+    assert guide['status'] == addon.GUIDE_PARSED
+    assert addon.lookup_guide('tt0110912') == guide
+    assert run(async_scrape.get_parsed_guide('tt9999999'))['status'] == addon.GUIDE_NOT_FOUND
+
+
+def test_client_follows_redirects():
+    async def follows():
+        return async_scrape.get_client().follow_redirects
+    assert run(follows())
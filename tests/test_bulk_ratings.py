@@ -0,0 +1,44 @@
+import json
+import threading
+
+import addon
+
+
+def guide(imdb_id):
+    return {"title": imdb_id, "age_rating": 12, "raw_ratings": {'content_categories': {}}, "status": addon.GUIDE_PARSED}
+
+
+def test_streams_every_title_once(monkeypatch):
+    monkeypatch.setattr(addon, 'get_cached_guide', lambda imdb_id: guide(imdb_id) if imdb_id == 'tt0000001' else None)
+    monkeypatch.setattr(addon, 'get_indexed_guide', lambda imdb_id: None)
+    monkeypatch.setattr(addon, 'get_parsed_guide', guide)
+    imdb_ids = ['tt0000001', 'bad', 'tt0000001'] + [f'tt{n:07d}' for n in range(2, 12)]
+
+    lines = [json.loads(line) for line in addon.stream_age_ratings(imdb_ids)]
+    assert lines[0]['id'] == 'tt0000001'
+    assert lines[1]['id'] == 'bad' and 'error' in lines[1]
+    assert sorted(line['id'] for line in lines[2:]) == [f'tt{n:07d}' for n in range(2, 12)]
+
+
+def test_closing_the_stream_cancels_queued_scrapes(monkeypatch):
+    release = threading.Event()
+    started = []
+
+    def slow_guide(imdb_id):
+        started.append(imdb_id)
+        if imdb_id != 'tt0000001':
+            release.wait(5)
+        return guide(imdb_id)
+
+    monkeypatch.setattr(addon, 'get_cached_guide', lambda imdb_id: None)
+    monkeypatch.setattr(addon, 'get_indexed_guide', lambda imdb_id: None)
+    monkeypatch.setattr(addon, 'get_parsed_guide', slow_guide)
+
+    stream = addon.stream_age_ratings([f'tt{n:07d}' for n in range(1, 51)])
+    assert json.loads(next(stream))['id'] == 'tt0000001'
+    # One finished and one replaced it; the rest were never submitted
+    assert len(started) <= addon.BULK_CONCURRENCY + 1
+    stream.close()
+    release.set()
+    addon.bulk_executor.submit(lambda: None).result()
+    assert len(started) <= addon.BULK_CONCURRENCY + 1
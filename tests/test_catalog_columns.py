@@ -0,0 +1,62 @@
+import random
+
+import addon
+from catalog_columns import CatalogColumns
+
+SEVERITIES = ['None', 'Mild', 'Moderate', 'Severe', 'none', 'Unknown']
+
+
+def random_guide(rng):
+    if rng.random() < 0.1:
+        return addon.failed_guide(rng.choice([addon.GUIDE_NOT_FOUND, addon.GUIDE_ERROR]), "Failed")
+    return {
+        'title': 'Title',
+        'age_rating': rng.choice([0, 6, 12, 13, 16, 18, 21, -4]),
+        'raw_ratings': {'content_categories': {
+            category: rng.choice(SEVERITIES) for category in addon.GUIDE_CATEGORIES if rng.random() < 0.8
+        }},
+        'status': addon.GUIDE_PARSED
+    }
+
+
+def build(items, guides):
+    return addon.build_catalog_columns('movie', items, guides)
+
+
+def test_filter_matches_per_item_check():
+    rng = random.Random(18)
+    items = [{'id': f'tt{n:07d}', 'title': f'Title {n}'} for n in range(500)]
+    guides = [random_guide(rng) for _ in items]
+    columns = build(items, guides)
+    configs = [None, 'age=0', 'age=13', 'age=18|violence=mild', 'age=254|nudity=none|profanity=moderate',
+               'age=1000', 'violence=severe|frightening=none']
+    for config in configs:
+        profile = addon.parse_profile(config)
+        expected = [f"gpg-{item['id']}" for item, guide in zip(items, guides) if addon.is_allowed(guide, profile)]
+        assert [meta['id'] for meta in addon.filter_catalog(columns, profile)] == expected, config
+
+
+def test_pending_and_failed_titles_are_counted():
+    items = [{'id': f'tt{n:07d}', 'title': f'Title {n}'} for n in range(4)]
+    guides = [
+        random_guide(random.Random(1)) | {'age_rating': 12},
+        addon.PENDING,
+        None,
+        addon.failed_guide(addon.GUIDE_ERROR, "Error"),
+    ]
+    columns = build(items, guides)
+    assert columns.pending == 1
+    assert columns.transient == 2
+    assert [meta['id'] for meta in columns.metas] == ['gpg-tt0000000', 'gpg-tt0000002', 'gpg-tt0000003']
+    assert [meta['id'] for meta in columns.filter(18)] == ['gpg-tt0000000']
+
+
+def test_not_found_titles_are_not_transient():
+    items = [{'id': 'tt0000001', 'title': 'Missing'}]
+    columns = build(items, [addon.failed_guide(addon.GUIDE_NOT_FOUND, "No parental guide available.")])
+    assert columns.transient == 0
+    assert columns.filter(254) == []
+
+
+def test_empty_catalog():
+    assert CatalogColumns.build('movie', [], [], addon.GUIDE_CATEGORIES, addon.SEVERITY_RANKS).filter(18) == []
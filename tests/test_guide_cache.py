@@ -0,0 +1,179 @@
+import fnmatch
+
+import pytest
+
+import guide_cache
+from guide_cache import (MemoryLRUCache, PAGE_TAG, RECORD_TAG, RedisCache, SQLiteCache, decode_value,
+                         encode_value)
+from guide_record import GuideRecord
+from page_store import RawPage
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """The subset of redis.Redis used by RedisCache, expiring keys on a fake clock."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.data = {}
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] <= self.clock.now:
+            del self.data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    def setex(self, key, ttl, value):
+        assert isinstance(value, bytes)
+        self.data[key] = (value, self.clock.now + ttl)
+
+    def ttl(self, key):
+        entry = self._live(key)
+        return int(entry[1] - self.clock.now) if entry else -2
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+
+RECORD = GuideRecord('Pulp Fiction (1994)', 17, 17, 'Rated R', (('violence', 4), ('profanity', 'Very High')),
+                     (('United States', 'R'),), (('violence', 'Shootings.'),), fresh_until=1234.5)
+PAGE = RawPage.from_response(b'<html>guide</html>', {'ETag': '"abc"', 'Last-Modified': 'Sat, 17 Oct 2026 00:00:00 GMT'})
+
+
+def test_record_round_trip():
+    raw = encode_value(RECORD)
+    assert raw[:1] == RECORD_TAG
+    assert decode_value(raw) == RECORD
+
+
+def test_page_round_trip():
+    raw = encode_value(PAGE)
+    assert raw[:1] == PAGE_TAG
+    page = decode_value(raw)
+    assert (page.etag, page.last_modified, page.digest, page.content) == \
+        (PAGE.etag, PAGE.last_modified, PAGE.digest, b'<html>guide</html>')
+    assert page.validators() == {'If-None-Match': '"abc"', 'If-Modified-Since': PAGE.last_modified}
+
+
+def test_json_round_trip():
+    value = {'items': [{'id': 'tt0110912', 'title': 'Pulp Fiction'}], 'fresh_until': 12.5}
+    assert decode_value(encode_value(value)) == value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(guide_cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def cache(request, clock):
+    if request.param == 'memory':
+        return MemoryLRUCache(16)
+    if request.param == 'sqlite':
+        return SQLiteCache(':memory:', 16)
+    return RedisCache(client=FakeRedis(clock))
+
+
+@pytest.mark.parametrize('value', [RECORD, {'metas': []}, ['a', 1]])
+def test_values_round_trip(cache, value):
+    cache.set('key', value, 60)
+    assert cache.get('key') == value
+
+
+def test_page_in_backend(cache):
+    cache.set('page', PAGE, 60)
+    assert cache.get('page').content == PAGE.content
+
+
+def test_entries_expire(cache, clock):
+    cache.set('key', RECORD, 60)
+    assert cache.ttl('key') == pytest.approx(60)
+    clock.now += 59
+    assert cache.get('key') == RECORD
+    assert cache.ttl('key') == pytest.approx(1)
+    clock.now += 1
+    assert cache.get('key') is None
+    assert cache.ttl('key') is None
+
+
+def test_delete_and_clear(cache):
+    cache.set('a', 1, 60)
+    cache.set('b', 2, 60)
+    cache.delete('a')
+    assert cache.get('a') is None
+    cache.clear()
+    assert cache.get('b') is None
+
+
+def test_sqlite_stores_blobs():
+    cache = SQLiteCache(':memory:')
+    cache.set('key', RECORD, 60)
+    kind, = cache._conn().execute('SELECT typeof(value) FROM guide_cache').fetchone()
+    assert kind == 'blob'
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryLRUCache(2)
+    cache.set('a', 1, 60)
+    cache.set('b', 2, 60)
+    cache.get('a')
+    cache.set('c', 3, 60)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+
+def accessed_at(cache, key):
+    return cache._conn().execute('SELECT accessed_at FROM guide_cache WHERE key = ?', (key,)).fetchone()[0]
+
+
+def test_sqlite_reads_touch_recency_at_most_once_a_minute(clock):
+    cache = SQLiteCache(':memory:', 16)
+    cache.set('key', RECORD, 3600)
+    stored = clock.now
+    clock.now += guide_cache.SQLITE_TOUCH_INTERVAL - 1
+    assert cache.get('key') == RECORD
+    assert accessed_at(cache, 'key') == stored
+    clock.now += 1
+    assert cache.get('key') == RECORD
+    assert accessed_at(cache, 'key') == clock.now
+
+
+def test_sqlite_evicts_least_recently_used(clock):
+    cache = SQLiteCache(':memory:', 2)
+    for index in range(99):
+        clock.now += 1
+        cache.set(f'old{index}', index, 3600)
+    clock.now += guide_cache.SQLITE_TOUCH_INTERVAL
+    cache.get('old0')
+    cache.set('new', 'value', 3600)  # The 100th write evicts
+    assert cache.get('old0') == 0
+    assert cache.get('new') == 'value'
+    assert cache.get('old98') is None
+
+
+def test_redis_caches_clear_only_their_own_keys(clock, monkeypatch):
+    server = FakeRedis(clock)
+    monkeypatch.setattr(guide_cache, 'redis', type('redis', (), {'Redis': type('Redis', (), {
+        'from_url': staticmethod(lambda url: server)})}))
+    guides, pages, catalogs = (guide_cache.create_cache('redis', name=name) for name in ('guide', 'page', 'catalog'))
+    for cache in (guides, pages, catalogs):
+        cache.set('key', 1, 60)
+    assert sorted(server.data) == ['gpg:catalog:key', 'gpg:guide:key', 'gpg:page:key']
+    pages.clear()
+    assert (guides.get('key'), pages.get('key'), catalogs.get('key')) == (1, None, 1)
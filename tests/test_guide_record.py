@@ -0,0 +1,66 @@
+import pytest
+
+import addon
+from conftest import read_fixture
+from guide_record import GuideRecord, HEADER_V1
+
+
+GUIDE_IDS = ['tt0068646', 'tt0110912', 'tt0903747', 'tt0910970', 'tt1375666', 'tt9999999']
+
+
+def scraped(imdb_id):
+    content = read_fixture(f'guide_{imdb_id}.html')
+    return addon.build_guide_record(imdb_id, addon.parse_guide_page(content))
+
+
+@pytest.mark.parametrize('imdb_id', GUIDE_IDS)
+def test_dict_round_trip(imdb_id):
+    guide = scraped(imdb_id)
+    assert GuideRecord.from_dict(guide).to_dict() == guide
+
+
+@pytest.mark.parametrize('imdb_id', GUIDE_IDS)
+def test_bytes_round_trip(imdb_id):
+    record = GuideRecord.from_dict(scraped(imdb_id))
+    record.fresh_until = 1760000000.5
+    assert GuideRecord.from_bytes(record.to_bytes()) == record
+
+
+def test_unknown_severities_and_custom_descriptions_are_kept():
+    guide = scraped('tt0110912')
+    guide['raw_ratings']['content_categories']['violence'] = 'Very High'
+    guide['content_description'] = 'Edited by hand'
+    decoded = GuideRecord.from_bytes(GuideRecord.from_dict(guide).to_bytes()).to_dict()
+    assert decoded == guide
+
+
+@pytest.mark.parametrize('status', [addon.GUIDE_NOT_FOUND, addon.GUIDE_ERROR])
+def test_failures_keep_their_status(status):
+    guide = addon.failed_guide(status, "No parental guide available.")
+    record = GuideRecord.from_bytes(GuideRecord.from_dict(guide).to_bytes())
+    assert record.failed
+    assert record.to_dict() == guide
+
+
+def test_records_without_status_are_read_by_their_ratings():
+    guide = scraped('tt1375666')
+    del guide['status']
+    assert GuideRecord.from_dict(guide).status == addon.GUIDE_PARSED
+    assert GuideRecord.from_dict({'title': 'Unknown Title', 'age_rating': 0, 'raw_ratings': {}}).status == addon.GUIDE_ERROR
+
+
+def test_version_1_records_are_read():
+    record = GuideRecord.from_dict(scraped('tt1375666'))
+    current = record.to_bytes()
+    # Version 1 had no fresh_until after the ages
+    v1 = HEADER_V1.pack(1, 0, record.age_rating, record.certificates_age_rating) + current[HEADER_V1.size + 8:]
+    decoded = GuideRecord.from_bytes(v1)
+    assert decoded.fresh_until == 0.0
+    assert decoded.to_dict() == record.to_dict()
+
+
+def test_unsupported_version_is_rejected():
+    data = bytearray(GuideRecord.from_dict(scraped('tt1375666')).to_bytes())
+    data[0] = 99
+    with pytest.raises(ValueError):
+        GuideRecord.from_bytes(bytes(data))
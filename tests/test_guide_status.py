@@ -0,0 +1,112 @@
+import asyncio
+import struct
+
+import pytest
+
+import addon
+import asgi
+import async_scrape
+from conftest import read_fixture
+from guide_cache import MemoryLRUCache
+from guide_record import GuideRecord
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = MemoryLRUCache()
+    monkeypatch.setattr(addon, 'guide_cache', cache)
+    return cache
+
+
+def build(imdb_id):
+    content = read_fixture(f'guide_{imdb_id}.html')
+    return addon.build_guide_record(imdb_id, addon.parse_guide_page(content))
+
+
+def test_page_without_guide_is_not_found():
+    guide = build('tt9999999')
+    assert guide['status'] == addon.GUIDE_NOT_FOUND
+    assert guide['age_rating'] is None
+    assert guide['raw_ratings'] == {}
+    assert not addon.is_allowed(guide, {'allowed_age': 99, 'max_severity': {}})
+
+
+def test_page_with_guide_is_parsed():
+    guide = build('tt0110912')
+    assert guide['status'] == addon.GUIDE_PARSED
+    assert guide['age_rating'] is not None
+    assert guide['raw_ratings']['age_certificates']
+
+
+def test_not_found_guide_is_cached_for_not_found_ttl(cache, monkeypatch):
+    stored = {}
+    monkeypatch.setattr(cache, 'set', lambda key, value, ttl: stored.update({key: (value, ttl)}))
+    addon.store_guide('tt9999999', build('tt9999999'))
+    record, ttl = stored['guide:tt9999999']
+    assert ttl == addon.GUIDE_NOT_FOUND_TTL
+    assert record.status == addon.GUIDE_NOT_FOUND
+    assert record.age_rating is None
+
+
+def test_not_found_record_round_trips_as_bytes():
+    record = GuideRecord.from_dict(build('tt9999999'))
+    decoded = GuideRecord.from_bytes(record.to_bytes())
+    assert decoded == record
+    assert decoded.age_rating is None
+
+
+def test_version_2_failure_reads_as_unrated():
+    record = GuideRecord.from_dict(addon.failed_guide(addon.GUIDE_ERROR, "Error"))
+    data = bytearray(record.to_bytes())
+    data[0] = 2
+    struct.pack_into('<h', data, 2, 0)  # Failures were stored with an age of 0 before version 3
+    decoded = GuideRecord.from_bytes(bytes(data))
+    assert decoded.status == addon.GUIDE_ERROR
+    assert decoded.age_rating is None
+
+
+def test_catalog_with_failed_titles_is_cached_briefly(monkeypatch):
+    monkeypatch.setattr(addon, '_catalog_columns', {})
+    monkeypatch.setattr(addon, 'get_catalog_items', lambda *args: [{'id': 'tt0110912', 'title': 'Pulp Fiction'}])
+    monkeypatch.setattr(addon, 'resolve_guides', lambda imdb_ids: [addon.unavailable_guide() for _ in imdb_ids])
+    response = addon.app.test_client().get('/catalog/movie/gpg_movies_catalog.json')
+    assert response.status_code == 200
+    assert response.get_json() == {'metas': []}
+    assert response.headers['Cache-Control'] == f'public, max-age={addon.CATALOG_PARTIAL_MAX_AGE}'
+    assert not addon._catalog_columns
+
+
+@pytest.mark.parametrize('path', ['/meta/movie/tt0110912.json', '/stream/movie/tt0110912.json'])
+def test_unavailable_guide_is_cached_briefly(monkeypatch, path):
+    monkeypatch.setattr(addon, 'get_parsed_guide', lambda imdb_id: addon.unavailable_guide())
+    response = addon.app.test_client().get(path)
+    assert response.status_code == 403
+    assert response.headers['Cache-Control'] == f'public, max-age={addon.GUIDE_ERROR_MAX_AGE}'
+
+
+def test_not_found_guide_keeps_the_long_max_age(monkeypatch):
+    monkeypatch.setattr(addon, 'get_parsed_guide', lambda imdb_id: build('tt9999999'))
+    response = addon.app.test_client().get('/meta/movie/tt9999999.json')
+    assert response.status_code == 403
+    assert response.headers['Cache-Control'] == f'public, max-age={addon.RESPONSE_MAX_AGE}'
+
+
+@pytest.mark.parametrize('handler', [asgi.addon_meta, asgi.addon_stream])
+def test_async_unavailable_guide_is_cached_briefly(monkeypatch, handler):
+    async def unavailable(imdb_id):
+        return addon.unavailable_guide()
+    monkeypatch.setattr(async_scrape, 'get_parsed_guide', unavailable)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+    asyncio.run(handler(send, 'movie', 'tt0110912', {}, addon.default_profile()))
+    assert messages[0]['status'] == 403
+    headers = dict(messages[0]['headers'])
+    assert headers[b'cache-control'] == f'public, max-age={addon.GUIDE_ERROR_MAX_AGE}'.encode()
+
+
+@pytest.mark.parametrize('imdb_id', ['tt0110912', 'tt0903747', 'tt9999999'])
+def test_guide_subtrees_hold_everything_the_extractor_reads(imdb_id):
+    content = read_fixture(f'guide_{imdb_id}.html')
+    assert addon.extract_guide(addon.parse_guide_page(content)) == addon.extract_guide(addon.parse_html(content))
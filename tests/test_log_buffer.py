@@ -0,0 +1,79 @@
+import logging
+import threading
+
+import pytest
+
+import addon
+from log_buffer import RingBufferHandler
+
+
+@pytest.fixture
+def buffer():
+    # conftest's quiet_logging fixture silences logging with logging.disable
+    disabled = logging.root.manager.disable
+    logging.disable(logging.NOTSET)
+    handler = RingBufferHandler(capacity=5)
+    log = logging.getLogger('test_log_buffer')
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    handler.log = log
+    yield handler
+    log.removeHandler(handler)
+    logging.disable(disabled)
+
+
+def messages(records):
+    return [record['message'] for record in records]
+
+
+def test_cursor_returns_only_new_records(buffer):
+    for n in range(3):
+        buffer.log.info('line %d', n)
+    assert buffer.last_seq == 3
+    records, dropped = buffer.since(1)
+    assert messages(records) == ['line 1', 'line 2'] and not dropped
+    assert buffer.since(3) == ([], False)
+    assert messages(buffer.since(0, limit=2)[0]) == ['line 0', 'line 1']
+
+
+def test_without_a_cursor_the_newest_records_are_returned(buffer):
+    for n in range(4):
+        buffer.log.warning('line %d', n)
+    records, _ = buffer.since(None, limit=2)
+    assert messages(records) == ['line 2', 'line 3']
+    assert records[-1]['level'] == 'WARNING' and records[-1]['logger'] == 'test_log_buffer'
+
+
+def test_dropped_records_are_reported(buffer):
+    for n in range(8):
+        buffer.log.info('line %d', n)
+    records, dropped = buffer.since(1)
+    assert dropped
+    assert messages(records) == [f'line {n}' for n in range(3, 8)]
+    assert [record['seq'] for record in records] == [4, 5, 6, 7, 8]
+    assert buffer.since(3) == (records, False)
+
+
+def test_cursor_from_before_a_restart_starts_over(buffer):
+    buffer.log.info('only line')
+    records, dropped = buffer.since(100)
+    assert messages(records) == ['only line'] and not dropped
+
+
+def test_wait_since_wakes_on_a_new_record(buffer):
+    timer = threading.Timer(0.05, buffer.log.info, ('late line',))
+    timer.start()
+    records, _ = buffer.wait_since(0, timeout=5)
+    timer.join()
+    assert messages(records) == ['late line']
+    assert buffer.wait_since(1, timeout=0.01) == ([], False)
+
+
+def test_live_tail_ends_with_its_cursor(monkeypatch):
+    monkeypatch.setattr(addon, 'LOG_STREAM_MAX_SECONDS', 0.05)
+    monkeypatch.setattr(addon, 'LOG_STREAM_HEARTBEAT', 0.01)
+    cursor = addon.log_buffer.last_seq
+    events = list(addon.stream_logs(cursor))
+    assert events[0] == 'retry: 2000\n\n'
+    assert events[-1] == f'id: {addon.log_buffer.last_seq}\n\n'
@@ -0,0 +1,76 @@
+import pytest
+
+import addon
+import metrics
+
+
+client = addon.app.test_client()
+
+
+@pytest.fixture
+def unregistered():
+    """Metrics created by a test are dropped from the registry afterwards."""
+    registered = list(metrics.REGISTRY)
+    yield
+    metrics.REGISTRY[:] = registered
+
+
+def sample(text, line_start):
+    """Value of the one exposition line starting with line_start."""
+    values = [line.rsplit(' ', 1)[1] for line in text.splitlines() if line.startswith(line_start + ' ')]
+    assert len(values) == 1, line_start
+    return float(values[0])
+
+
+def test_counter_and_gauge_exposition(unregistered):
+    counter = metrics.Counter('test_events_total', 'Events.', ['kind'])
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    gauge = metrics.Gauge('test_in_flight', 'In flight.')
+    with gauge.track():
+        assert gauge.samples() == ['test_in_flight 1']
+    assert counter.render() == [
+        '# HELP test_events_total Events.',
+        '# TYPE test_events_total counter',
+        'test_events_total{kind="a\\"b"} 3',
+    ]
+    assert gauge.samples() == ['test_in_flight 0']
+
+
+def test_histogram_buckets_are_cumulative(unregistered):
+    histogram = metrics.Histogram('test_seconds', 'Latency.', ['route'], buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, '/x')
+    assert histogram.samples() == [
+        'test_seconds_bucket{route="/x",le="0.1"} 1',
+        'test_seconds_bucket{route="/x",le="1"} 2',
+        'test_seconds_bucket{route="/x",le="+Inf"} 3',
+        'test_seconds_sum{route="/x"} 5.55',
+        'test_seconds_count{route="/x"} 3',
+    ]
+
+
+def test_metrics_route_counts_requests_and_upstream_fetches(stub):
+    route = 'gpg_responses_total{route="/meta/<type>/<id>.json",status="200"}'
+    upstream = 'gpg_upstream_responses_total{kind="guide",status="200"}'
+    lookups = 'gpg_cache_lookups_total{cache="guide",result="hit"}'
+    before = client.get('/metrics').get_data(as_text=True)
+
+    # Profile prefixes are counted under the plain route
+    assert client.get('/age=18/meta/movie/tt0110912.json').status_code == 200
+    assert client.get('/age=x/meta/movie/tt0110912.json').status_code == 400
+    assert client.get('/meta/movie/tt0110912.json').status_code == 403
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+
+    def grew(line_start):
+        return sample(text, line_start) - (sample(before, line_start) if line_start in before else 0)
+    assert grew(route) == 1
+    assert grew('gpg_responses_total{route="/meta/<type>/<id>.json",status="400"}') == 1
+    assert grew('gpg_responses_total{route="/meta/<type>/<id>.json",status="403"}') == 1
+    assert grew(upstream) == 1
+    assert grew(lookups) == 1
+    assert '# TYPE gpg_request_duration_seconds histogram' in text
+    assert 'gpg_parse_duration_seconds_count{stage="guide_html"}' in text
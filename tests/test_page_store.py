@@ -0,0 +1,95 @@
+import pytest
+
+import addon
+import async_scrape
+from conftest import read_fixture, run
+from guide_cache import MemoryLRUCache
+from page_store import RawPage
+
+
+@pytest.fixture
+def store(stub, monkeypatch):
+    store = MemoryLRUCache()
+    monkeypatch.setattr(addon, 'page_store', store)
+    return store
+
+
+@pytest.fixture
+def requests_sent(monkeypatch):
+    """Record the headers and response status of every guide page fetch, sync and async."""
+    sent = []
+    imdb_get, async_imdb_get = addon.imdb_get, async_scrape.imdb_get
+
+    def record(url, **kwargs):
+        response = imdb_get(url, **kwargs)
+        sent.append((kwargs.get('headers') or {}, response.status_code))
+        return response
+
+    async def record_async(url, headers=None):
+        response = await async_imdb_get(url, headers=headers)
+        sent.append((headers or {}, response.status_code))
+        return response
+
+    monkeypatch.setattr(addon, 'imdb_get', record)
+    monkeypatch.setattr(async_scrape, 'imdb_get', record_async)
+    return sent
+
+
+def sync_scrape(imdb_id, previous=None):
+    return addon.scrape_movie(imdb_id, previous)
+
+
+def async_scrape_movie(imdb_id, previous=None):
+    return run(async_scrape.scrape_movie(imdb_id, previous))
+
+
+@pytest.fixture(params=[sync_scrape, async_scrape_movie], ids=['sync', 'async'])
+def scrape(request):
+    return request.param
+
+
+def test_first_fetch_stores_the_page_with_its_etag(store, requests_sent, scrape):
+    guide = scrape('tt0110912')
+    assert guide['status'] == addon.GUIDE_PARSED
+    headers, status = requests_sent[0]
+    assert 'If-None-Match' not in headers and status == 200
+    page = store.get('page:tt0110912')
+    assert page.etag and page.content == read_fixture('guide_tt0110912.html')
+
+
+def test_not_modified_page_reuses_the_cached_guide(store, requests_sent, scrape, monkeypatch):
+    previous = scrape('tt0110912')
+    etag = store.get('page:tt0110912').etag
+    monkeypatch.setattr(addon, 'extract_guide', lambda soup: pytest.fail("the guide page was parsed again"))
+    assert scrape('tt0110912', previous) is previous
+    headers, status = requests_sent[1]
+    assert headers['If-None-Match'] == etag
+    assert status == 304
+
+
+def test_unchanged_body_skips_the_parse(store, requests_sent, scrape, monkeypatch):
+    previous = scrape('tt0110912')
+    page = store.get('page:tt0110912')
+    # A changed ETag gets a full response, but the body hashes the same as the stored copy
+    page.etag = '"outdated"'
+    addon.store_page('tt0110912', page)
+    monkeypatch.setattr(addon, 'extract_guide', lambda soup: pytest.fail("the guide page was parsed again"))
+    assert scrape('tt0110912', previous) is previous
+    assert requests_sent[1] == ({'If-None-Match': '"outdated"'}, 200)
+    assert store.get('page:tt0110912').etag != '"outdated"'
+
+
+def test_changed_body_is_parsed(store, requests_sent, scrape):
+    previous = scrape('tt0110912')
+    page = RawPage.from_response(b'<html>older copy</html>', {'ETag': '"older"'})
+    addon.store_page('tt0110912', page)
+    guide = scrape('tt0110912', previous)
+    assert guide is not previous
+    assert guide == previous
+    assert requests_sent[1][1] == 200
+
+
+def test_not_modified_without_a_cached_guide_is_parsed_from_the_store(store, requests_sent, scrape):
+    expected = scrape('tt0110912')
+    assert scrape('tt0110912') == expected
+    assert requests_sent[1][1] == 304
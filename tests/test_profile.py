@@ -0,0 +1,42 @@
+import pytest
+
+import addon
+
+
+def guide(age_rating, **categories):
+    return {'age_rating': age_rating, 'raw_ratings': {'content_categories': categories}}
+
+
+def test_empty_config_is_the_default_profile():
+    assert addon.parse_profile(None) == addon.default_profile()
+    assert addon.parse_profile('') == addon.default_profile()
+
+
+def test_age_and_category_limits():
+    profile = addon.parse_profile(' Age=12 | violence=Moderate|nudity=none|')
+    assert profile == {'allowed_age': 12, 'max_severity': {'violence': 2, 'nudity': 0}}
+
+
+@pytest.mark.parametrize('config', ['age=twelve', 'age=-1', 'gore=mild', 'violence=extreme', 'violence', 'age'])
+def test_malformed_entries_are_rejected(config):
+    with pytest.raises(ValueError):
+        addon.parse_profile(config)
+
+
+def test_profiles_do_not_share_state():
+    addon.parse_profile('violence=mild')
+    assert addon.parse_profile(None)['max_severity'] == {}
+
+
+def test_is_allowed_applies_age_and_category_limits():
+    profile = addon.parse_profile('age=13|violence=moderate')
+    assert addon.is_allowed(guide(13, violence='Moderate'), profile)
+    assert not addon.is_allowed(guide(14, violence='Mild'), profile)
+    assert not addon.is_allowed(guide(10, violence='Severe'), profile)
+    assert not addon.is_allowed(guide(None), profile)
+    assert addon.blocked_categories(guide(10, violence='Severe', nudity='Severe'), profile) == ['violence']
+
+
+def test_invalid_config_in_the_url_is_rejected():
+    client = addon.app.test_client()
+    assert client.get('/violence=extreme/manifest.json').status_code == 400
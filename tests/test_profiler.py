@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+import addon
+from guide_cache import MemoryLRUCache
+from profiler import Profile, ProfileStore, StackSampler
+
+
+def busy_in_traced_call(started, release):
+    started.set()
+    release.wait(5)
+
+
+def busy_elsewhere(started, release):
+    started.set()
+    release.wait(5)
+
+
+def test_sampler_only_includes_traced_workers():
+    sampler = StackSampler(Profile('/catalog'), threading.get_ident(), interval=60)
+    release = threading.Event()
+    traced, other = threading.Event(), threading.Event()
+    threads = [
+        threading.Thread(target=sampler.traced(busy_in_traced_call), args=(traced, release), name='scrape_0'),
+        threading.Thread(target=busy_elsewhere, args=(other, release), name='scrape_1'),
+    ]
+    for thread in threads:
+        thread.start()
+    traced.wait(5)
+    other.wait(5)
+    sampler.sample()
+    release.set()
+    for thread in threads:
+        thread.join()
+    sampler.sample()
+    profile = sampler.stop()
+
+    stacks = ''.join(profile.stacks)
+    assert 'busy_in_traced_call' in stacks
+    assert 'busy_elsewhere' not in stacks
+    assert sum(1 for stack in profile.stacks if stack.startswith('scrape_0;')) == 1
+    assert profile.samples == 2
+
+
+@pytest.fixture
+def profiling(stub, monkeypatch):
+    monkeypatch.setattr(addon, 'PROFILE_ENABLED', True)
+    monkeypatch.setattr(addon, 'profile_store', ProfileStore(2))
+    monkeypatch.setattr(addon, 'catalog_cache', MemoryLRUCache())
+    monkeypatch.setattr(addon, '_catalog_columns', {})
+    stub.RequestHandlerClass.latency = 0.05
+    return addon.app.test_client()
+
+
+def test_profile_routes_are_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(addon, 'PROFILE_ENABLED', False)
+    client = addon.app.test_client()
+    assert client.get('/profile').status_code == 404
+    assert client.get('/profile/1.folded').status_code == 404
+    assert 'X-Profile-Id' not in client.get('/stats?profile=1').headers
+
+
+def test_catalog_profile_includes_its_scrapes(profiling):
+    response = profiling.get('/catalog/movie/gpg_movies_catalog.json?profile=1')
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+
+    profiles = profiling.get('/profile').get_json()['profiles']
+    assert [profile['id'] for profile in profiles] == [profile_id]
+    assert profiles[0]['route'] == '/catalog/movie/gpg_movies_catalog.json?profile=1'
+    assert profiles[0]['samples'] > 0
+
+    folded = profiling.get(f'/profile/{profile_id}.folded')
+    assert folded.status_code == 200
+    assert folded.headers['Content-Disposition'] == f'attachment; filename=profile-{profile_id}.folded'
+    stacks = folded.get_data(as_text=True).splitlines()
+    assert any(stack.startswith('request;') for stack in stacks)
+    assert any(stack.startswith('scrape') and 'get_parsed_guide' in stack for stack in stacks)
+
+
+def test_unknown_profile_is_not_found(profiling):
+    assert profiling.get('/profile/0.folded').status_code == 404
+    assert 'X-Profile-Id' not in profiling.get('/stats').headers
+    assert profiling.get('/profile').get_json() == {'profiles': []}
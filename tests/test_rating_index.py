@@ -0,0 +1,68 @@
+import addon
+import crawl
+from rating_index import RatingIndex, pack_record, unpack_record, write_index
+
+
+CATEGORIES = list(addon.GUIDE_CATEGORIES)
+
+
+def parsed_guide(title, age_rating):
+    return {
+        "content_description": "",
+        "title": title,
+        "age_rating": age_rating,
+        "certificates_age_rating": age_rating,
+        "content_comments": {},
+        "raw_ratings": {
+            'mpa_rating': 'Rated R',
+            'content_categories': {'violence': 'Severe', 'profanity': 'Mild'},
+            'age_certificates': {'United States': 'R', 'Österreich': '16'}
+        },
+        "status": addon.GUIDE_PARSED
+    }
+
+
+def test_pack_unpack_round_trip():
+    fields = unpack_record(pack_record(parsed_guide('Léon', 16), CATEGORIES), CATEGORIES)
+    assert fields == {
+        'age_rating': 16,
+        'certificates_age_rating': 16,
+        'title': 'Léon',
+        'mpa_rating': 'Rated R',
+        'content_categories': {'violence': 'Severe', 'profanity': 'Mild'},
+        'age_certificates': {'United States': 'R', 'Österreich': '16'}
+    }
+
+
+def test_index_lookup(tmp_path):
+    path = str(tmp_path / 'index.bin')
+    records = {f'tt{n:07d}': pack_record(parsed_guide(f'Title {n}', n % 19), CATEGORIES) for n in range(1, 200, 3)}
+    records['nm0000001'] = b'[]'  # Not a title ID; left out of the index
+    assert write_index(path, records) == len(records) - 1
+
+    index = RatingIndex(path)
+    try:
+        assert len(index) == len(records) - 1
+        for imdb_id, data in records.items():
+            if imdb_id.startswith('tt'):
+                assert index.get(imdb_id) == data
+        assert index.get('tt0000002') is None
+        assert index.get('tt9999999') is None
+        assert index.get('nm0000001') is None
+        assert index.get('tt12ab') is None
+    finally:
+        index.close()
+
+
+def test_crawl_only_indexes_parsed_guides(tmp_path, monkeypatch):
+    guides = {
+        'tt0000001': parsed_guide('Parsed', 12),
+        'tt0000002': addon.failed_guide(addon.GUIDE_NOT_FOUND, "No parental guide available."),
+        'tt0000003': addon.failed_guide(addon.GUIDE_ERROR, "Error"),
+    }
+    monkeypatch.setattr(addon, 'scrape_movie', lambda imdb_id: guides[imdb_id])
+    state_path = str(tmp_path / 'state.tsv')
+
+    counts = crawl.crawl(list(guides), state_path, workers=2, rate=0)
+    assert counts == {'crawled': 1, 'not_found': 1, 'failed': 1, 'skipped': 0}
+    assert list(crawl.read_state(state_path)) == ['tt0000001']
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+import addon
+import async_scrape
+from conftest import run
+
+
+SLOW, BROKEN = 'tt0000001', 'tt0000002'
+
+
+def guide(imdb_id):
+    return {'title': imdb_id, 'age_rating': 12, 'raw_ratings': {}, 'status': addon.GUIDE_PARSED}
+
+
+@pytest.fixture
+def scrapes(monkeypatch):
+    """Stand-in scrapes: SLOW waits until released, BROKEN raises, anything else resolves at once."""
+    release = threading.Event()
+    calls = []
+
+    def get_parsed_guide(imdb_id):
+        calls.append(imdb_id)
+        if imdb_id == SLOW:
+            release.wait(5)
+        if imdb_id == BROKEN:
+            raise RuntimeError("broken page")
+        return guide(imdb_id)
+
+    async def get_parsed_guide_async(imdb_id):
+        calls.append(imdb_id)
+        if imdb_id == SLOW:
+            await asyncio.to_thread(release.wait, 5)
+        if imdb_id == BROKEN:
+            raise RuntimeError("broken page")
+        return guide(imdb_id)
+
+    monkeypatch.setattr(addon, 'get_parsed_guide', get_parsed_guide)
+    monkeypatch.setattr(async_scrape, 'get_parsed_guide', get_parsed_guide_async)
+    yield calls, release
+    release.set()
+
+
+def test_unresolved_titles_are_pending_at_the_deadline(scrapes):
+    calls, release = scrapes
+    guides = addon.resolve_guides(['tt1', SLOW, BROKEN, 'tt1'], deadline=0.2)
+    assert guides == [guide('tt1'), addon.PENDING, None, guide('tt1')]
+    assert sorted(calls) == sorted(['tt1', SLOW, BROKEN])
+
+
+def test_pending_scrapes_keep_running_after_the_deadline(scrapes, monkeypatch):
+    calls, release = scrapes
+    finished = threading.Event()
+    original = addon.get_parsed_guide
+
+    def tracked(imdb_id):
+        try:
+            return original(imdb_id)
+        finally:
+            finished.set()
+    monkeypatch.setattr(addon, 'get_parsed_guide', tracked)
+    assert addon.resolve_guides([SLOW], deadline=0.05) == [addon.PENDING]
+    assert not finished.is_set()
+    release.set()
+    assert finished.wait(5)
+
+
+def test_catalog_leaves_pending_titles_out(monkeypatch):
+    monkeypatch.setattr(addon, '_catalog_columns', {})
+    items = [{'id': 'tt1', 'title': 'One'}, {'id': SLOW, 'title': 'Slow'}]
+    columns = addon.build_catalog_columns('movie', items, [guide('tt1'), addon.PENDING])
+    assert columns.pending == 1
+    assert [meta['id'] for meta in addon.filter_catalog(columns)] == ['gpg-tt1']
+    addon.store_columns('chart:movie', 'movie', items, columns)
+    assert addon.get_cached_columns('chart:movie', 'movie', items) is None
+
+
+def test_async_unresolved_titles_are_pending_at_the_deadline(scrapes):
+    calls, release = scrapes
+
+    async def resolve():
+        guides = await async_scrape.resolve_guides(['tt1', SLOW, BROKEN, 'tt1'], deadline=0.2)
+        release.set()
+        return guides
+    assert run(resolve()) == [guide('tt1'), addon.PENDING, None, guide('tt1')]
+    assert sorted(calls) == sorted(['tt1', SLOW, BROKEN])
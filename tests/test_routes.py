@@ -0,0 +1,126 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import addon
+from conftest import read_fixture
+from guide_cache import MemoryLRUCache
+
+
+client = addon.app.test_client()
+
+
+def test_stats_are_not_cached():
+    response = client.get('/stats')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, max-age=0'
+    assert set(response.get_json()) == {'http', 'coalesced'}
+
+
+def test_catalog_entries_use_their_own_cache(monkeypatch):
+    monkeypatch.setattr(addon, 'guide_cache', MemoryLRUCache())
+    monkeypatch.setattr(addon, 'catalog_cache', MemoryLRUCache(2))
+    items = [{'id': 'tt0110912', 'title': 'Pulp Fiction'}]
+    for query in ('a', 'b', 'c'):
+        addon.store_catalog_items('gpg_search_movie', addon.catalog_cache_key('gpg_search_movie', query), items)
+    assert addon.read_catalog_entry('search:movie:a') is None
+    assert addon.read_catalog_entry('search:movie:c')['items'] == items
+    assert not addon.guide_cache._data
+
+
+def test_search_keys_are_normalised():
+    assert addon.catalog_cache_key('gpg_search_movie', '  The   Godfather ') == 'search:movie:the godfather'
+    assert addon.catalog_cache_key('gpg_search_series', 'Lost') == 'search:series:lost'
+    assert addon.catalog_cache_key('unknown') is None
+
+
+def test_prewarm_is_disabled_without_a_token(monkeypatch):
+    monkeypatch.setattr(addon, 'PREWARM_TOKEN', '')
+    assert client.post('/prewarm').status_code == 404
+
+
+def test_prewarm_requires_the_token(monkeypatch):
+    monkeypatch.setattr(addon, 'PREWARM_TOKEN', 'secret')
+    monkeypatch.setattr(addon, '_prewarm_lock', threading.Lock())
+    addon._prewarm_lock.acquire()  # A warm is already running
+    assert client.get('/prewarm').status_code == 405
+    assert client.post('/prewarm').status_code == 403
+    assert client.post('/prewarm', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    response = client.post('/prewarm', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert response.get_json()['started'] is False
+
+
+def test_one_process_holds_the_scheduler_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(addon, 'PREWARM_LOCK_PATH', str(tmp_path / 'prewarm.lock'))
+    monkeypatch.setattr(addon, '_prewarm_lock_file', None)
+    other = open(tmp_path / 'prewarm.lock', 'a')
+    addon.fcntl.flock(other, addon.fcntl.LOCK_EX | addon.fcntl.LOCK_NB)
+    assert not addon.claim_prewarm_scheduler()
+    other.close()
+    assert addon.claim_prewarm_scheduler()
+    assert addon.claim_prewarm_scheduler()
+    addon._prewarm_lock_file.close()
+
+
+@pytest.fixture
+def warm(monkeypatch):
+    """Warm a chart of three fixture titles without touching IMDb."""
+    items = [{'id': imdb_id, 'title': imdb_id} for imdb_id in ('tt0110912', 'tt9999999', 'tt0000404')]
+    monkeypatch.setattr(addon, 'guide_cache', MemoryLRUCache())
+    monkeypatch.setattr(addon, 'PREWARM_CATALOGS', (('gpg_movies_catalog', 'movie'),))
+    monkeypatch.setattr(addon, 'refresh_catalog_items', lambda *args: items)
+    monkeypatch.setattr(addon, 'scrape_movie', lambda imdb_id, previous=None: build_guide(imdb_id))
+    return addon.warm_catalogs
+
+
+def build_guide(imdb_id):
+    if imdb_id == 'tt0000404':
+        return addon.failed_guide(addon.GUIDE_ERROR, "Error")
+    return addon.build_guide_record(imdb_id, addon.parse_guide_page(read_fixture(f'guide_{imdb_id}.html')))
+
+
+def test_prewarm_rate_of_zero_is_unthrottled(warm, monkeypatch):
+    monkeypatch.setattr(addon, 'PREWARM_RATE', 0)
+    assert warm()['titles'] == 3
+
+
+def test_prewarm_counts_titles_by_guide_status(warm):
+    assert warm() == {'titles': 3, 'scraped': 1, 'not_found': 1, 'failed': 1, 'skipped': 0}
+
+
+def test_concurrent_prewarm_posts_start_one_warm(warm, monkeypatch):
+    monkeypatch.setattr(addon, 'PREWARM_TOKEN', 'secret')
+    monkeypatch.setattr(addon, '_prewarm_lock', threading.Lock())
+    monkeypatch.setattr(addon, '_prewarm_state', dict(addon._prewarm_state))
+    monkeypatch.setattr(addon, 'catalog_cache', MemoryLRUCache())
+    release = threading.Event()
+    monkeypatch.setattr(addon, 'refresh_catalog_items', lambda *args: release.wait(5) and [])
+    barrier = threading.Barrier(4)
+
+    def post(_):
+        barrier.wait()
+        return addon.app.test_client().post('/prewarm', headers={'Authorization': 'Bearer secret'}).status_code
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        statuses = list(executor.map(post, range(4)))
+    assert sorted(statuses) == [200, 200, 200, 202]
+    assert addon._prewarm_state['running']
+    release.set()
+    with addon._prewarm_lock:
+        assert addon._prewarm_state['last_result']['titles'] == 0
+
+
+def test_busy_connection_pool_does_not_block(stub, monkeypatch):
+    monkeypatch.setattr(addon, 'HTTP_POOL_MAXSIZE', 1)
+    monkeypatch.setattr(addon, 'http_session', addon.create_http_session())
+    monkeypatch.setattr(addon, 'imdb_bucket', addon.TokenBucket(0, 1))
+    stub.RequestHandlerClass.latency = 0.3
+    url = f'{stub.base_url}/title/tt0110912/parentalguide'
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        responses = list(executor.map(lambda _: addon.imdb_get(url), range(3)))
+    # With a blocking pool the requests would run one after another
+    assert time.monotonic() - start < 0.6
+    assert [response.status_code for response in responses] == [200, 200, 200]
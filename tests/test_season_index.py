@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import addon
+import async_scrape
+from conftest import run
+
+
+@pytest.fixture
+def season_fetches(stub, monkeypatch):
+    """Count the episode list requests sent to the stub server, sync and async."""
+    fetched = []
+    imdb_get, async_imdb_get = addon.imdb_get, async_scrape.imdb_get
+
+    def count(url, **kwargs):
+        fetched.append(url)
+        return imdb_get(url, **kwargs)
+
+    async def count_async(url, headers=None):
+        fetched.append(url)
+        return await async_imdb_get(url, headers=headers)
+
+    monkeypatch.setattr(addon, 'imdb_get', count)
+    monkeypatch.setattr(async_scrape, 'imdb_get', count_async)
+    return fetched
+
+
+def test_episode_ids_come_from_the_cached_season(season_fetches):
+    assert addon.getEpId('tt0903747_1_3') == 'tt1054725'
+    assert addon.getEpId('tt0903747_1_7') == 'tt1054729'
+    assert addon.get_cached_season_index('tt0903747', '1')['1'] == 'tt0959621'
+    assert len(season_fetches) == 1
+
+
+def test_episode_out_of_range_is_not_found(season_fetches):
+    assert addon.getEpId('tt0903747_1_99') is None
+    assert addon.getEpId('tt0903747') is None
+
+
+def test_missing_season_is_not_cached(season_fetches):
+    assert addon.getEpId('tt0903747_9_1') is None
+    assert addon.getEpId('tt0903747_9_2') is None
+    assert addon.get_cached_season_index('tt0903747', '9') is None
+    assert len(season_fetches) == 2
+
+
+def test_empty_index_is_not_cached(stub):
+    assert addon.store_season_index('tt0903747', '1', None) is None
+    assert addon.store_season_index('tt0903747', '1', {}) == {}
+    assert addon.get_cached_season_index('tt0903747', '1') is None
+
+
+def test_concurrent_misses_share_one_fetch(season_fetches, stub):
+    stub.RequestHandlerClass.latency = 0.2
+    calls = addon.season_flight.stats()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        ep_ids = list(executor.map(addon.getEpId, ['tt0903747_2_1', 'tt0903747_2_2', 'tt0903747_2_1', 'tt0903747_2_3']))
+    assert ep_ids[0] == ep_ids[2] and None not in ep_ids
+    assert len(season_fetches) == 1
+    stats = addon.season_flight.stats()
+    assert stats['coalesced'] - calls['coalesced'] == 3
+
+
+def test_async_concurrent_misses_share_one_fetch(season_fetches, stub):
+    stub.RequestHandlerClass.latency = 0.2
+
+    async def resolve():
+        return await asyncio.gather(*(async_scrape.getEpId(f'tt0903747_2_{episode}') for episode in (1, 2, 3)))
+    assert run(resolve()) == [addon.getEpId(f'tt0903747_2_{episode}') for episode in (1, 2, 3)]
+    assert len(season_fetches) == 1
@@ -0,0 +1,21 @@
+import addon
+
+
+def content_checks(results):
+    return [test for test in results if test['name'].startswith('Content Check')]
+
+
+def test_fixture_mode_checks_every_fixture_title():
+    results = list(addon.run_self_test(fixtures=True))
+    assert all(test['status'] == 'passed' for test in results), results
+    checked = {test['endpoint'].rsplit('-', 1)[1] for test in content_checks(results)}
+    assert checked == addon.FIXTURE_TEST_MOVIES
+    assert addon.self_test_summary(results, True)['overall_status'] == 'passed'
+
+
+def test_missing_recording_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(addon, 'SELF_TEST_FIXTURES', str(tmp_path))
+    results = list(addon.run_self_test(fixtures=True))
+    assert content_checks(results)
+    assert all(test['status'] == 'failed' for test in content_checks(results))
+    assert addon.self_test_summary(results, True)['overall_status'] == 'failed'
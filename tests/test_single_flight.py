@@ -0,0 +1,65 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'guide'
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(flight.do, 'tt0110912', load)
+        started.wait(5)
+        followers = [executor.submit(flight.do, 'tt0110912', load) for _ in range(4)]
+        while flight.stats()['coalesced'] < 4:
+            time.sleep(0.001)
+        release.set()
+        assert leader.result() == 'guide'
+        assert [follower.result() for follower in followers] == ['guide'] * 4
+    assert len(calls) == 1
+    assert flight.stats() == {'calls': 1, 'coalesced': 4}
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError('upstream error')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, 'key', fail)
+        started.wait(5)
+        follower = executor.submit(flight.do, 'key', fail)
+        while flight.stats()['coalesced'] < 1:
+            time.sleep(0.001)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+    # The failed call is gone, so the next one runs again
+    assert flight.do('key', lambda: 'retried') == 'retried'
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+    assert flight.do('a', lambda: 3) == 3
+    flight.record(coalesced=True)
+    assert flight.stats() == {'calls': 3, 'coalesced': 1}
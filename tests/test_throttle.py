@@ -0,0 +1,170 @@
+import asyncio
+from email.utils import formatdate
+
+import pytest
+
+import addon
+import async_scrape
+import throttle
+from throttle import CircuitBreaker, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle, 'time', clock)
+    return clock
+
+
+def test_token_bucket_allows_a_burst_then_queues(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # Each caller past the burst waits one interval longer than the one before it
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+    clock.now += 10
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_turns_callers_away_past_max_wait(clock):
+    bucket = TokenBucket(rate=2, burst=1, max_wait=1)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0.5, 1.0]
+    # The queue stops growing: rejected callers take no token
+    assert [bucket.reserve() for _ in range(3)] == [None, None, None]
+    clock.now += 0.5
+    assert bucket.reserve() == 1.0
+
+
+def test_full_rate_limit_queue_fails_fast(monkeypatch, clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    monkeypatch.setattr(addon, 'imdb_breaker', breaker)
+    monkeypatch.setattr(addon, 'imdb_bucket', TokenBucket(rate=1, burst=1, max_wait=0))
+    monkeypatch.setattr(addon.http_session, 'get', lambda *args, **kwargs: pytest.fail("request was sent"))
+    addon.imdb_bucket.reserve()
+    throttled = addon.get_fetch_stats()['throttled']
+    with pytest.raises(addon.UpstreamUnavailable):
+        addon.imdb_get('http://imdb.test/title/tt0110912/parentalguide')
+    assert addon.get_fetch_stats()['throttled'] == throttled + 1
+    assert breaker.state == 'closed'
+
+
+def test_token_bucket_without_a_rate_never_waits(clock):
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_repeated_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+    assert breaker.stats() == {'state': 'open', 'failures': 3, 'opened': 1}
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure(retry_after=60)
+    clock.now += 59
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.stats()['opened'] == 2
+
+
+def test_released_probe_lets_the_next_caller_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+
+
+def test_parse_retry_after(clock):
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after(' 120 ') == 120.0
+    assert parse_retry_after(formatdate(clock.now + 90, usegmt=True)) == pytest.approx(90)
+    assert parse_retry_after(formatdate(clock.now - 90, usegmt=True)) == 0.0
+    assert parse_retry_after('soon') is None
+
+
+class Interrupted(BaseException):
+    pass
+
+
+@pytest.fixture
+def half_open(monkeypatch, clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    monkeypatch.setattr(addon, 'imdb_breaker', breaker)
+    monkeypatch.setattr(addon, 'imdb_bucket', TokenBucket(rate=0, burst=1))
+    return breaker
+
+
+def test_interrupted_sync_probe_is_released(half_open, monkeypatch):
+    def interrupted(*args, **kwargs):
+        raise Interrupted()
+
+    monkeypatch.setattr(addon.http_session, 'get', interrupted)
+    with pytest.raises(Interrupted):
+        addon.imdb_get('http://imdb.test/title/tt0110912/parentalguide')
+    assert half_open.allow()
+
+
+def test_cancelled_async_probe_is_released(half_open, monkeypatch):
+    # The probe is cancelled while it waits for its rate-limit token
+    monkeypatch.setattr(addon, 'imdb_bucket', TokenBucket(rate=0.001, burst=1))
+    addon.imdb_bucket.reserve()
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(async_scrape.imdb_get('http://imdb.test/title/tt0110912/parentalguide'))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert half_open.allow()
@@ -0,0 +1,112 @@
+# throttle.py
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Any
+
+
+class UpstreamUnavailable(Exception):
+    """IMDb is throttling or failing and the request was not served."""
+
+
+class TokenBucket:
+    """Shared request budget: `rate` requests per second with bursts of up to `burst`.
+
+    Callers past the burst queue behind each other; once the queue is `max_wait` seconds
+    long, further callers are turned away instead of being handed an ever longer wait.
+    """
+
+    def __init__(self, rate: float, burst: int, max_wait: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_wait = max_wait  # None lets the queue grow without bound
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> Optional[float]:
+        """Take a token, returning how many seconds the caller must wait before using it.
+
+        Returns None, without taking a token, if the wait would exceed max_wait.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # A negative balance queues callers behind each other instead of letting them race
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if self.max_wait is not None and wait > self.max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+class CircuitBreaker:
+    """Stops calling upstream after repeated failures, then lets one probe through after a cool-down."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if not self._open_until:
+                return True
+            if time.monotonic() < self._open_until or self._probing:
+                return False
+            self._probing = True  # Half-open: this caller's request decides
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """Free the half-open probe slot after a request that recorded no outcome, e.g. one
+        that was cancelled, so the next caller can probe instead of the breaker staying open.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if not self._open_until or self._probing:
+                    self._opened += 1
+                self._open_until = time.monotonic() + max(self.reset_timeout, retry_after or 0)
+                self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if not self._open_until:
+                return 'closed'
+            return 'open' if time.monotonic() < self._open_until or self._probing else 'half-open'
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {'state': state, 'failures': self._failures, 'opened': self._opened}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given as seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None